@@ -2,69 +2,157 @@ import socket
 import threading
 import json
 import sys
-from database import AUBRegistrarDatabase
+import time
+from storage import BACKENDS, storage_factory, to_capacity
+from profiling import ProfilingHooks
+from analytics import EnrollmentAnalytics
+from scheduler import DEFAULT_COHORT, GATED_COMMANDS, RegistrationScheduler, parse_start
+
+# Admin commands backed by ProfilingHooks; never profiled themselves
+DIAGNOSTIC_COMMANDS = ("profile_start", "profile_report",
+                       "memory_snapshot", "memory_diff")
+
+# Admin command -> EnrollmentAnalytics report method
+ANALYTICS_REPORTS = {
+    "analytics_fill_rates": "fill_rates",
+    "analytics_full_courses": "full_courses",
+    "analytics_slot_demand": "slot_demand",
+    "analytics_student_loads": "student_loads",
+    "analytics_waitlist": "waitlist_pressure",
+}
 
 class AUBRegistrarServer:
-    def __init__(self, port):
+    def __init__(self, port, backend="sqlite"):
         self.port = port
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.db_name = "aub_registrar.db"
+        self.backend = backend
+        self.open_storage = storage_factory(backend, self.db_name)
+        self.profiler = ProfilingHooks()
+        self.analytics = EnrollmentAnalytics()
+        self.scheduler = RegistrationScheduler()
         
-        # Initialize database schema
-        with AUBRegistrarDatabase(self.db_name) as db:
-            pass  # The database will create tables in its __init__
+        # Initialize database schema, then seed the analytics counters and
+        # registration windows once
+        with self.open_storage() as db:
+            self.analytics.load(db.get_courses(), db.get_student_usernames())
+            self.scheduler.load(db.get_registration_windows())
         
         # Start server
         self.server_socket.bind(('', self.port))
         self.server_socket.listen(5)
-        print(f"Server started on port {self.port}")
+        print(f"Server started on port {self.port} ({self.backend} storage)")
+
+    MAX_BUFFERED_BYTES = 1024 * 1024
+
+    @staticmethod
+    def split_messages(buffer):
+        """
+        Split received bytes into complete messages; return (messages, leftover).
+        Messages are newline-terminated JSON. A trailing chunk without a newline
+        that already parses as JSON is also accepted, so clients that send one
+        bare JSON object per request keep working.
+        """
+        *lines, leftover = buffer.split(b"\n")
+        if leftover:
+            try:
+                json.loads(leftover.decode())
+                lines.append(leftover)
+                leftover = b""
+            except ValueError:
+                pass
+        return [line for line in lines if line.strip()], leftover
 
     def handle_client(self, client_socket, address):
         try:
-            with AUBRegistrarDatabase(self.db_name) as db:
+            with self.open_storage() as db:
+                session = {}  # filled in by a successful login on this connection
+                buffer = b""
                 while True:
-                    data = client_socket.recv(4096).decode()
+                    data = client_socket.recv(4096)
                     if not data:
                         break
-                    
-                    try:
-                        request = json.loads(data)
-                        print(f"Received request: {request}")  # Debug logging
-                        response = self.process_request(request, db)
-                        print(f"Sending response: {response}")  # Debug logging
-                        client_socket.send(json.dumps(response).encode())
-                    except json.JSONDecodeError as e:
-                        print(f"JSON decode error: {str(e)}")
-                        client_socket.send(json.dumps({
-                            "status": "error",
-                            "message": "Invalid request format"
-                        }).encode())
-                    except Exception as e:
-                        print(f"Error processing request: {str(e)}")
-                        client_socket.send(json.dumps({
-                            "status": "error",
-                            "message": "Internal server error"
-                        }).encode())
+
+                    messages, buffer = self.split_messages(buffer + data)
+                    if len(buffer) > self.MAX_BUFFERED_BYTES:
+                        messages.append(buffer)
+                        buffer = b""
+
+                    for message in messages:
+                        response = self.respond(message, db, session)
+                        client_socket.sendall((json.dumps(response) + "\n").encode())
         except Exception as e:
             print(f"Error handling client {address}: {str(e)}")
         finally:
             client_socket.close()
-    def process_request(self, request, db):
+
+    def respond(self, message, db, session):
+        """Decode one message, dispatch it and echo its request_id back."""
+        try:
+            request = json.loads(message.decode())
+            print(f"Received request: {request}")  # Debug logging
+            if self.profiler.active and request.get("command") not in DIAGNOSTIC_COMMANDS:
+                response = self.profiler.run(str(request.get("command")),
+                                             self.process_request,
+                                             request, db, session)
+            else:
+                response = self.process_request(request, db, session)
+            if "request_id" in request:
+                response["request_id"] = request["request_id"]
+            print(f"Sending response: {response}")  # Debug logging
+            return response
+        except ValueError as e:
+            print(f"JSON decode error: {str(e)}")
+            return {"status": "error", "message": "Invalid request format"}
+        except Exception as e:
+            print(f"Error processing request: {str(e)}")
+            return {"status": "error", "message": "Internal server error"}
+
+    def update_analytics(self, hook, *args):
+        """
+        Feed a committed mutation to the analytics counters. The change is
+        already in storage, so a failure here is logged, never sent back.
+        """
+        try:
+            getattr(self.analytics, hook)(*args)
+        except Exception as e:
+            print(f"Analytics update failed ({hook}): {str(e)}")
+
+    def process_request(self, request, db, session=None):
         """
         Handle every incoming JSON request and return a JSON‑serialisable dict.
         NOTE: this is now a single if/elif/else ladder so we always hit at most
         one branch and never fall through to the generic "Invalid command".
+        `session` is the per-connection dict that remembers who logged in.
         """
         try:
             command  = (request.get("command") or "").lower()
             username = request.get("username")
             password = request.get("password")
 
+            # Early arrivals are turned away before touching storage. The
+            # logged-in student is gated first; the payload username too, so
+            # naming someone else cannot reach a window that is still closed.
+            if command in GATED_COMMANDS:
+                identities = {username}
+                if session and session.get("username"):
+                    identities.add(session["username"])
+                hints = [self.scheduler.retry_at(identity) for identity in identities]
+                retry_at = max((hint for hint in hints if hint is not None), default=None)
+                if retry_at is not None:
+                    return {"status": "error",
+                            "message": "Registration window not open yet",
+                            "retry_at": retry_at,
+                            "retry_after": max(retry_at - time.time(), 0)}
+
             # ------------------------------------------------------------------
             # 1) LOGIN  ─────────────────────────────────────────────────────────
             if command == "login":
                 role = db.authenticate(username, password)
+                if role and session is not None:
+                    session["username"] = username
+                    session["role"] = role
                 return ({"status": "success", "role": role}
                         if role else
                         {"status": "error", "message": "Invalid credentials"})
@@ -72,7 +160,18 @@ class AUBRegistrarServer:
             # ------------------------------------------------------------------
             # 2) STUDENT COMMANDS  ─────────────────────────────────────────────
             elif command == "list_courses":
-                return {"status": "success", "courses": db.get_courses()}
+                # Read the version first: a change racing with get_courses is
+                # then simply re-sent by the next list_courses_since
+                version = db.get_catalog_version()
+                return {"status": "success", "courses": db.get_courses(),
+                        "version": version}
+
+            elif command == "list_courses_since":
+                version = request.get("version")
+                if not isinstance(version, int):
+                    return {"status": "success", "resync": True,
+                            "version": db.get_catalog_version()}
+                return {"status": "success", **db.get_courses_since(version)}
 
             elif command == "get_registered_courses":
                 if not username:
@@ -83,6 +182,10 @@ class AUBRegistrarServer:
             elif command == "register_course":
                 course_name = request.get("course_name")
                 ok = db.register_course(username, course_name)
+                if ok:
+                    self.update_analytics("registered", username, course_name)
+                else:
+                    self.update_analytics("registration_rejected", course_name)
                 return ({"status": "success", "message": "Course registered successfully"}
                         if ok else
                         {"status": "error", "message": "Cannot register for course"})
@@ -90,6 +193,8 @@ class AUBRegistrarServer:
             elif command == "withdraw_course":
                 course_name = request.get("course_name")
                 ok = db.withdraw_course(username, course_name)
+                if ok:
+                    self.update_analytics("withdrew", username, course_name)
                 return ({"status": "success", "message": "Course withdrawn successfully"}
                         if ok else
                         {"status": "error", "message": "Cannot withdraw from course"})
@@ -97,16 +202,26 @@ class AUBRegistrarServer:
             # ------------------------------------------------------------------
             # 3) ADMIN COMMANDS  ───────────────────────────────────────────────
             elif command == "create_course":
-                ok = db.create_course(request.get("course_name"),
-                                      request.get("capacity"),
+                capacity = to_capacity(request.get("capacity"))
+                if capacity is None:
+                    return {"status": "error", "message": "Invalid capacity"}
+                ok = db.create_course(request.get("course_name"), capacity,
                                       request.get("schedule"))
+                if ok:
+                    self.update_analytics("course_created", request.get("course_name"),
+                                          capacity, request.get("schedule"))
                 return ({"status": "success", "message": "Course created successfully"}
                         if ok else
                         {"status": "error", "message": "Course already exists"})
 
             elif command == "update_course":
-                ok = db.update_course_capacity(request.get("course_name"),
-                                               request.get("new_capacity"))
+                new_capacity = to_capacity(request.get("new_capacity"))
+                if new_capacity is None:
+                    return {"status": "error", "message": "Invalid capacity"}
+                ok = db.update_course_capacity(request.get("course_name"), new_capacity)
+                if ok:
+                    self.update_analytics("capacity_updated", request.get("course_name"),
+                                          new_capacity)
                 return ({"status": "success", "message": "Course capacity updated"}
                         if ok else
                         {"status": "error", "message": "Course does not exist or invalid capacity"})
@@ -115,12 +230,98 @@ class AUBRegistrarServer:
                 ok = db.add_student(request.get("student_username"),
                                     request.get("student_password"),
                                     request.get("student_full_name"))
+                if ok:
+                    self.update_analytics("student_added", request.get("student_username"))
                 return ({"status": "success", "message": "Student added successfully"}
                         if ok else
                         {"status": "error", "message": "Student already exists"})
 
             # ------------------------------------------------------------------
-            # 4) UNKNOWN COMMAND  ──────────────────────────────────────────────
+            # 4) DIAGNOSTICS (admin session only)  ─────────────────────────────
+            elif command in DIAGNOSTIC_COMMANDS:
+                if not session or session.get("role") != "admin":
+                    return {"status": "error", "message": "Admin login required"}
+
+                if command == "profile_start":
+                    requests = request.get("requests")
+                    seconds = request.get("seconds")
+                    self.profiler.start(int(requests) if requests is not None else None,
+                                        float(seconds) if seconds is not None else None)
+                    return {"status": "success", "message": "Profiling started"}
+
+                elif command == "profile_report":
+                    return {"status": "success",
+                            "report": self.profiler.report(bool(request.get("stop", True)))}
+
+                elif command == "memory_snapshot":
+                    self.profiler.memory_snapshot()
+                    return {"status": "success", "message": "Memory snapshot taken"}
+
+                else:
+                    return {"status": "success",
+                            "report": self.profiler.memory_diff(bool(request.get("stop", True)))}
+
+            # ------------------------------------------------------------------
+            # 5) ENROLLMENT ANALYTICS (admin session only)  ────────────────────
+            elif command in ANALYTICS_REPORTS:
+                if not session or session.get("role") != "admin":
+                    return {"status": "error", "message": "Admin login required"}
+                report = getattr(self.analytics, ANALYTICS_REPORTS[command])()
+                return {"status": "success", "report": report}
+
+            # ------------------------------------------------------------------
+            # 6) REGISTRATION WINDOWS (admin session only)  ────────────────────
+            elif command in ("set_registration_window", "remove_registration_window",
+                             "set_default_window", "registration_windows"):
+                if not session or session.get("role") != "admin":
+                    return {"status": "error", "message": "Admin login required"}
+
+                try:
+                    start = request.get("start")
+                    start = parse_start(start) if start is not None else None
+                except ValueError:
+                    return {"status": "error", "message": "Invalid start time"}
+
+                if command == "set_registration_window":
+                    if start is None or not request.get("cohort"):
+                        return {"status": "error", "message": "Cohort and start time required"}
+                    if request.get("cohort") == DEFAULT_COHORT:
+                        return {"status": "error", "message": "Reserved cohort name"}
+                    usernames = request.get("usernames") or []
+                    known = set(db.get_student_usernames())
+                    unknown = [u for u in usernames if u not in known]
+                    if unknown:
+                        return {"status": "error",
+                                "message": f"Unknown students: {', '.join(map(str, unknown))}"}
+                    # Saved first, so the lookup never holds a window a restart would lose
+                    db.save_registration_window(request.get("cohort"), start, usernames)
+                    self.scheduler.set_cohort(request.get("cohort"), start, usernames)
+                    return {"status": "success", "message": "Registration window set"}
+
+                elif command == "remove_registration_window":
+                    ok = (request.get("cohort") != DEFAULT_COHORT and
+                          db.delete_registration_window(request.get("cohort")))
+                    if ok:
+                        self.scheduler.remove_cohort(request.get("cohort"))
+                    return ({"status": "success", "message": "Registration window removed"}
+                            if ok else
+                            {"status": "error", "message": "No such cohort"})
+
+                elif command == "set_default_window":
+                    if start is None:
+                        db.delete_registration_window(DEFAULT_COHORT)
+                    else:
+                        db.save_registration_window(DEFAULT_COHORT, start, [])
+                    self.scheduler.set_default_start(start)
+                    return {"status": "success", "message": "Default window set"}
+
+                else:
+                    return {"status": "success",
+                            "windows": self.scheduler.admissions(
+                                db.get_student_usernames())}
+
+            # ------------------------------------------------------------------
+            # 7) UNKNOWN COMMAND  ──────────────────────────────────────────────
             else:
                 return {"status": "error", "message": "Invalid command"}
 
@@ -142,13 +343,18 @@ class AUBRegistrarServer:
             self.server_socket.close()
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python server.py <port>")
+    if len(sys.argv) not in (2, 3):
+        print(f"Usage: python server.py <port> [{'|'.join(BACKENDS)}]")
+        sys.exit(1)
+
+    backend = sys.argv[2] if len(sys.argv) == 3 else "sqlite"
+    if backend not in BACKENDS:
+        print(f"Storage backend must be one of: {', '.join(BACKENDS)}")
         sys.exit(1)
     
     try:
         port = int(sys.argv[1])
-        server = AUBRegistrarServer(port)
+        server = AUBRegistrarServer(port, backend)
         server.start()
     except ValueError:
         print("Port must be a number")
@@ -0,0 +1,156 @@
+import threading
+from typing import Dict, Iterable, List
+
+FULL_LOAD = 5          # same cap AUBRegistrarDatabase.register_course enforces
+NEAR_FULL_RATIO = 0.9
+FILL_BUCKETS = ("0-24%", "25-49%", "50-74%", "75-89%", "90-99%", "full")
+
+
+def _fill_bucket(capacity: int, enrolled: int) -> str:
+    if enrolled >= capacity:
+        return "full"
+    ratio = enrolled / capacity
+    if ratio >= NEAR_FULL_RATIO:
+        return "90-99%"
+    if ratio >= 0.75:
+        return "75-89%"
+    if ratio >= 0.5:
+        return "50-74%"
+    if ratio >= 0.25:
+        return "25-49%"
+    return "0-24%"
+
+
+class EnrollmentAnalytics:
+    """
+    Enrollment counters kept up to date by the server after every successful
+    create/update/register/withdraw, so reports never re-read the JSON rosters.
+    The storage engine is scanned once, in load(), when the server starts.
+
+    Every update touches a constant number of counters; every report reads
+    them directly (the only sorting is over courses that turned students away).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._courses: Dict[str, list] = {}       # name -> [capacity, enrolled, schedule]
+        self._student_load: Dict[str, int] = {}   # username -> number of courses
+        self._load_counts: Dict[int, int] = {}    # number of courses -> number of students
+        self._fill_buckets: Dict[str, int] = {bucket: 0 for bucket in FILL_BUCKETS}
+        self._full = set()
+        self._near_full = set()
+        self._slot_demand: Dict[str, list] = {}   # schedule -> [enrolled, capacity]
+        self._turned_away: Dict[str, int] = {}    # course -> rejected while full
+
+    def load(self, courses: List[Dict], students: Iterable[str]) -> None:
+        with self._lock:
+            for username in students:
+                self._set_load(username, 0)
+            for course in courses:
+                enrolled = len(course["students"])
+                self._courses[course["course_name"]] = [course["capacity"], enrolled,
+                                                        course["schedule"]]
+                self._track(course["course_name"])
+                for username in course["students"]:
+                    self._set_load(username, self._student_load.get(username, 0) + 1)
+
+    # ------------------------------------------------------------------
+    # Internal bookkeeping (self._lock held)
+    def _track(self, course_name: str, sign: int = 1) -> None:
+        capacity, enrolled, schedule = self._courses[course_name]
+        self._fill_buckets[_fill_bucket(capacity, enrolled)] += sign
+
+        slot = self._slot_demand.setdefault(schedule, [0, 0])
+        slot[0] += sign * enrolled
+        slot[1] += sign * capacity
+
+        full = enrolled >= capacity
+        near_full = not full and enrolled >= capacity * NEAR_FULL_RATIO
+        for members, is_member in ((self._full, full), (self._near_full, near_full)):
+            if sign > 0 and is_member:
+                members.add(course_name)
+            elif sign < 0:
+                members.discard(course_name)
+
+    def _set_load(self, username: str, count: int) -> None:
+        old = self._student_load.get(username)
+        if old is not None:
+            self._load_counts[old] -= 1
+        self._student_load[username] = count
+        self._load_counts[count] = self._load_counts.get(count, 0) + 1
+
+    # ------------------------------------------------------------------
+    # Updates from the server
+    def course_created(self, course_name: str, capacity: int, schedule: str) -> None:
+        with self._lock:
+            self._courses[course_name] = [capacity, 0, schedule]
+            self._track(course_name)
+
+    def capacity_updated(self, course_name: str, new_capacity: int) -> None:
+        with self._lock:
+            if course_name not in self._courses:
+                return
+            self._track(course_name, -1)
+            self._courses[course_name][0] = new_capacity
+            self._track(course_name)
+            # Extra seats relieve the pressure counted so far
+            self._turned_away.pop(course_name, None)
+
+    def student_added(self, username: str) -> None:
+        with self._lock:
+            self._set_load(username, 0)
+
+    def registered(self, username: str, course_name: str) -> None:
+        with self._lock:
+            if course_name in self._courses:
+                self._track(course_name, -1)
+                self._courses[course_name][1] += 1
+                self._track(course_name)
+            self._set_load(username, self._student_load.get(username, 0) + 1)
+
+    def withdrew(self, username: str, course_name: str) -> None:
+        with self._lock:
+            if course_name in self._courses:
+                self._track(course_name, -1)
+                self._courses[course_name][1] -= 1
+                self._track(course_name)
+            self._set_load(username, max(self._student_load.get(username, 1) - 1, 0))
+
+    def registration_rejected(self, course_name: str) -> None:
+        """Count a failed registration as waitlist demand if the course is full."""
+        with self._lock:
+            course = self._courses.get(course_name)
+            if course and course[1] >= course[0]:
+                self._turned_away[course_name] = self._turned_away.get(course_name, 0) + 1
+
+    # ------------------------------------------------------------------
+    # Reports
+    def fill_rates(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._fill_buckets)
+
+    def full_courses(self) -> Dict[str, List[str]]:
+        with self._lock:
+            return {"full": sorted(self._full), "near_full": sorted(self._near_full)}
+
+    def slot_demand(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {schedule: {"enrolled": enrolled, "capacity": capacity}
+                    for schedule, (enrolled, capacity) in self._slot_demand.items()
+                    if capacity or enrolled}
+
+    def student_loads(self) -> Dict:
+        with self._lock:
+            distribution = {count: students
+                            for count, students in sorted(self._load_counts.items())
+                            if students}
+            below = sum(students for count, students in distribution.items()
+                        if count < FULL_LOAD)
+            return {"distribution": distribution, "below_full_load": below}
+
+    def waitlist_pressure(self) -> List[Dict]:
+        with self._lock:
+            return [{"course_name": course_name, "turned_away": count}
+                    for course_name, count in sorted(self._turned_away.items(),
+                                                     key=lambda item: item[1],
+                                                     reverse=True)]
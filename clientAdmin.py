@@ -1,18 +1,19 @@
-import socket
-import json
 import sys
 import getpass
+from registrar_client import CatalogCache, RegistrarClient, RegistrarConnectionError
+import time
 
 class AUBRegistrarAdminClient:
     def __init__(self, host='localhost', port=5000):
         self.host = host
         self.port = port
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.client = RegistrarClient(host, port)
+        self.catalog = CatalogCache()
         self.connected = False
 
     def connect(self):
         try:
-            self.socket.connect((self.host, self.port))
+            self.client.connect()
             self.connected = True
             print("Connected to AUB Registrar Server")
             return True
@@ -22,10 +23,8 @@ class AUBRegistrarAdminClient:
 
     def send_request(self, request):
         try:
-            self.socket.send(json.dumps(request).encode())
-            response = self.socket.recv(4096).decode()
-            return json.loads(response)
-        except Exception as e:
+            return self.client.request(request)
+        except RegistrarConnectionError as e:
             print(f"Error communicating with server: {str(e)}")
             return {"status": "error", "message": "Communication error"}
 
@@ -47,12 +46,10 @@ class AUBRegistrarAdminClient:
                 print("Invalid credentials. Please try again.")
 
     def list_courses(self):
-        response = self.send_request({
-            "command": "list_courses"
-        })
+        response = self.catalog.refresh(self.send_request)
         
         if response.get("status") == "success":
-            courses = response.get("courses", [])
+            courses = self.catalog.courses()
             if not courses:
                 print("No courses available.")
                 return
@@ -132,15 +129,162 @@ class AUBRegistrarAdminClient:
         else:
             print("Error:", response.get("message"))
 
+    def save_report(self, kind, report):
+        filename = f"{kind}_report_{time.strftime('%Y%m%d_%H%M%S')}.txt"
+        with open(filename, "w") as f:
+            f.write(report)
+        print(report)
+        print(f"Report saved to {filename}")
+
+    def diagnostics(self):
+        print("\nDiagnostics")
+        print("1. Start Profiling")
+        print("2. Download Profiling Report")
+        print("3. Take Memory Snapshot")
+        print("4. Download Memory Diff")
+        choice = input("\nEnter your choice (1-4): ")
+
+        if choice == "1":
+            request = {"command": "profile_start"}
+            try:
+                requests = input("Profile the next N requests (blank for no limit): ")
+                seconds = input("Profile for S seconds (blank for no limit): ")
+                if requests:
+                    request["requests"] = int(requests)
+                if seconds:
+                    request["seconds"] = float(seconds)
+            except ValueError:
+                print("Limits must be numbers")
+                return
+            response = self.send_request(request)
+        elif choice == "2":
+            response = self.send_request({"command": "profile_report"})
+        elif choice == "3":
+            response = self.send_request({"command": "memory_snapshot"})
+        elif choice == "4":
+            keep = input("Keep tracing for another diff? (y/N): ").strip().lower() == "y"
+            response = self.send_request({"command": "memory_diff", "stop": not keep})
+        else:
+            print("Invalid choice.")
+            return
+
+        if response.get("status") != "success":
+            print("Error:", response.get("message"))
+        elif "report" in response:
+            self.save_report("profile" if choice == "2" else "memory", response["report"])
+        else:
+            print(response.get("message"))
+
+    def analytics(self):
+        print("\nEnrollment Analytics")
+        print("1. Fill-Rate Distribution")
+        print("2. Full / Near-Full Courses")
+        print("3. Demand per Schedule Slot")
+        print("4. Students by Course Count")
+        print("5. Waitlist Pressure")
+        choice = input("\nEnter your choice (1-5): ")
+
+        commands = {
+            "1": "analytics_fill_rates",
+            "2": "analytics_full_courses",
+            "3": "analytics_slot_demand",
+            "4": "analytics_student_loads",
+            "5": "analytics_waitlist",
+        }
+        if choice not in commands:
+            print("Invalid choice.")
+            return
+
+        response = self.send_request({"command": commands[choice]})
+        if response.get("status") != "success":
+            print("Error:", response.get("message"))
+            return
+
+        report = response.get("report")
+        print("-" * 60)
+        if choice == "1":
+            for bucket, count in report.items():
+                print(f"{bucket:<20} {count:<10}")
+        elif choice == "2":
+            print(f"{'Full:':<20} {', '.join(report['full']) or 'None'}")
+            print(f"{'Near full (90%+):':<20} {', '.join(report['near_full']) or 'None'}")
+        elif choice == "3":
+            print(f"{'Schedule':<20} {'Enrolled':<10} {'Capacity':<10}")
+            for schedule, slot in report.items():
+                print(f"{schedule:<20} {slot['enrolled']:<10} {slot['capacity']:<10}")
+        elif choice == "4":
+            print(f"{'Courses':<20} {'Students':<10}")
+            for count, students in report["distribution"].items():
+                print(f"{count:<20} {students:<10}")
+            print(f"Students below a full load: {report['below_full_load']}")
+        else:
+            if not report:
+                print("No registrations turned away by full courses.")
+            for entry in report:
+                print(f"{entry['course_name']:<20} {entry['turned_away']:<10}")
+
+    def registration_windows(self):
+        print("\nRegistration Windows")
+        print("1. Set Cohort Window")
+        print("2. Remove Cohort Window")
+        print("3. Set Default Window (students in no cohort)")
+        print("4. View Admissions per Window")
+        choice = input("\nEnter your choice (1-4): ")
+
+        if choice == "1":
+            cohort = input("Enter cohort name: ")
+            start = input("Enter start time (YYYY-MM-DD HH:MM): ")
+            usernames = [u.strip() for u in input("Enter student usernames (comma separated): ").split(",")
+                         if u.strip()]
+            response = self.send_request({
+                "command": "set_registration_window",
+                "cohort": cohort,
+                "start": start,
+                "usernames": usernames
+            })
+        elif choice == "2":
+            response = self.send_request({
+                "command": "remove_registration_window",
+                "cohort": input("Enter cohort name: ")
+            })
+        elif choice == "3":
+            start = input("Enter start time (YYYY-MM-DD HH:MM, blank for no restriction): ")
+            response = self.send_request({
+                "command": "set_default_window",
+                "start": start or None
+            })
+        elif choice == "4":
+            response = self.send_request({"command": "registration_windows"})
+            if response.get("status") == "success":
+                print("-" * 80)
+                print(f"{'Cohort':<20} {'Opens':<20} {'Students':<10} {'Admitted by then':<20}")
+                print("-" * 80)
+                for window in response.get("windows", []):
+                    opens = (time.strftime("%Y-%m-%d %H:%M", time.localtime(window["start"]))
+                             if window["start"] is not None else "Open now")
+                    print(f"{window['cohort']:<20} {opens:<20} {window['students']:<10} {window['cumulative']:<20}")
+                return
+        else:
+            print("Invalid choice.")
+            return
+
+        if response.get("status") == "success":
+            print(response.get("message"))
+        else:
+            print("Error:", response.get("message"))
+
     def show_menu(self):
         print("\nAUB Registrar - Admin Portal")
         print("1. List All Courses")
         print("2. Create New Course")
         print("3. Update Course Capacity")
         print("4. Add New Student")
-        print("5. Exit")
+        print("5. Diagnostics (profiling / memory)")
+        print("6. Enrollment Analytics")
+        print("7. Registration Windows")
+        print("8. Exit")
         
-        choice = input("\nEnter your choice (1-5): ")
+        choice = input("\nEnter your choice (1-8): ")
         return choice
 
     def run(self):
@@ -162,12 +306,18 @@ class AUBRegistrarAdminClient:
             elif choice == "4":
                 self.add_student()
             elif choice == "5":
+                self.diagnostics()
+            elif choice == "6":
+                self.analytics()
+            elif choice == "7":
+                self.registration_windows()
+            elif choice == "8":
                 print("Thank you for using AUB Registrar. Goodbye!")
                 break
             else:
                 print("Invalid choice. Please try again.")
         
-        self.socket.close()
+        self.client.close()
 
 if __name__ == "__main__":
     if len(sys.argv) != 3:
@@ -1,19 +1,20 @@
-import socket
-import json
 import sys
 import getpass
+import time
+from registrar_client import CatalogCache, RegistrarClient, RegistrarConnectionError
 
 class AUBRegistrarStudentClient:
     def __init__(self, host='localhost', port=5000):
         self.host = host
         self.port = port
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.client = RegistrarClient(host, port)
+        self.catalog = CatalogCache()
         self.username = None
         self.connected = False
 
     def connect(self):
         try:
-            self.socket.connect((self.host, self.port))
+            self.client.connect()
             self.connected = True
             print("Connected to AUB Registrar Server")
             return True
@@ -23,10 +24,8 @@ class AUBRegistrarStudentClient:
 
     def send_request(self, request):
         try:
-            self.socket.send(json.dumps(request).encode())
-            response = self.socket.recv(4096).decode()
-            return json.loads(response)
-        except Exception as e:
+            return self.client.request(request)
+        except RegistrarConnectionError as e:
             print(f"Error communicating with server: {str(e)}")
             return {"status": "error", "message": "Communication error"}
 
@@ -52,12 +51,10 @@ class AUBRegistrarStudentClient:
                 print("Invalid credentials. Please try again.\n")
                 
     def list_courses(self):
-        response = self.send_request({
-            "command": "list_courses"
-        })
+        response = self.catalog.refresh(self.send_request)
         
         if response.get("status") == "success":
-            courses = response.get("courses", [])
+            courses = self.catalog.courses()
             if not courses:
                 print("No courses available.")
                 return
@@ -105,6 +102,8 @@ class AUBRegistrarStudentClient:
         
         if response.get("status") == "success":
             print("Successfully registered for", course_name)
+        elif "retry_at" in response:
+            self.print_window_notice(response)
         else:
             print("Error:", response.get("message"))
 
@@ -119,9 +118,15 @@ class AUBRegistrarStudentClient:
         
         if response.get("status") == "success":
             print("Successfully withdrawn from", course_name)
+        elif "retry_at" in response:
+            self.print_window_notice(response)
         else:
             print("Error:", response.get("message"))
 
+    def print_window_notice(self, response):
+        opens = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(response["retry_at"]))
+        print(f"Your registration window has not opened yet. Please try again at {opens}.")
+
     def show_menu(self):
         print("\nAUB Registrar - Student Portal")
         print("1. List Available Courses")
@@ -157,7 +162,7 @@ class AUBRegistrarStudentClient:
             else:
                 print("Invalid choice. Please try again.")
         
-        self.socket.close()
+        self.client.close()
 
 if __name__ == "__main__":
     if len(sys.argv) != 3:
@@ -2,7 +2,9 @@ import sqlite3
 import json
 from typing import List, Dict, Set, Optional
 
-class AUBRegistrarDatabase:
+from storage import CHANGE_LOG_SIZE, RegistrarStorage, to_capacity
+
+class AUBRegistrarDatabase(RegistrarStorage):
     def __init__(self, db_name: str = "aub_registrar.db"):
         self.db_name = db_name
         self.conn = None
@@ -50,6 +52,25 @@ class AUBRegistrarDatabase:
             except sqlite3.OperationalError:
                 pass
             
+            # Catalog change log: one row per course mutation, trimmed to the
+            # last CHANGE_LOG_SIZE rows. The AUTOINCREMENT sequence is the
+            # catalog version, so it never goes backwards.
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS catalog_changes (
+                version INTEGER PRIMARY KEY AUTOINCREMENT,
+                course_name TEXT NOT NULL
+            )
+            ''')
+            
+            # Registration windows, reloaded by the server at startup
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS registration_windows (
+                cohort TEXT PRIMARY KEY,
+                start REAL NOT NULL,
+                usernames TEXT DEFAULT '[]'  -- JSON array of student usernames
+            )
+            ''')
+            
             # Create admin table
             cursor.execute('''
             CREATE TABLE IF NOT EXISTS admin (
@@ -66,7 +87,19 @@ class AUBRegistrarDatabase:
             
             conn.commit()
 
+    def _record_change(self, cursor, course_name: str) -> None:
+        """Bump the catalog version; committed together with the mutation."""
+        cursor.execute('''
+        INSERT INTO catalog_changes (course_name) VALUES (?)
+        ''', (course_name,))
+        cursor.execute('''
+        DELETE FROM catalog_changes WHERE version <= ?
+        ''', (cursor.lastrowid - CHANGE_LOG_SIZE,))
+
     def add_student(self, username: str, password: str, full_name: str) -> bool:
+        # A TEXT PRIMARY KEY still accepts NULL in SQLite, so check it here
+        if username is None:
+            return False
         try:
             cursor = self.conn.cursor()
             cursor.execute('''
@@ -79,18 +112,26 @@ class AUBRegistrarDatabase:
             return False
 
     def create_course(self, course_name: str, capacity: int, schedule: str) -> bool:
+        capacity = to_capacity(capacity)
+        if course_name is None or capacity is None:
+            return False
         try:
             cursor = self.conn.cursor()
             cursor.execute('''
             INSERT INTO courses (course_name, capacity, remaining, schedule)
             VALUES (?, ?, ?, ?)
             ''', (course_name, capacity, capacity, schedule))
+            self._record_change(cursor, course_name)
             self.conn.commit()
             return True
         except sqlite3.IntegrityError:
             return False
 
     def update_course_capacity(self, course_name: str, new_capacity: int) -> bool:
+        new_capacity = to_capacity(new_capacity)
+        if new_capacity is None:
+            return False
+
         cursor = self.conn.cursor()
         cursor.execute('''
         SELECT capacity, students FROM courses WHERE course_name = ?
@@ -113,6 +154,7 @@ class AUBRegistrarDatabase:
         SET capacity = ?, remaining = ?
         WHERE course_name = ?
         ''', (new_capacity, remaining, course_name))
+        self._record_change(cursor, course_name)
         self.conn.commit()
         return True
 
@@ -160,6 +202,7 @@ class AUBRegistrarDatabase:
         SET remaining = ?, students = ?
         WHERE course_name = ?
         ''', (course_result[0] - 1, json.dumps(students), course_name))
+        self._record_change(cursor, course_name)
         
         # Update student
         registered_courses.append(course_name)
@@ -205,6 +248,7 @@ class AUBRegistrarDatabase:
         SET remaining = ?, students = ?
         WHERE course_name = ?
         ''', (course_result[0] + 1, json.dumps(students), course_name))
+        self._record_change(cursor, course_name)
         
         # Update student
         registered_courses.remove(course_name)
@@ -217,12 +261,48 @@ class AUBRegistrarDatabase:
         self.conn.commit()
         return True
 
-    def get_courses(self) -> List[Dict]:
+    def get_catalog_version(self) -> int:
         cursor = self.conn.cursor()
         cursor.execute('''
-        SELECT course_name, capacity, remaining, schedule, students
-        FROM courses
+        SELECT seq FROM sqlite_sequence WHERE name = 'catalog_changes'
         ''')
+        result = cursor.fetchone()
+        return result[0] if result else 0
+
+    def get_courses_since(self, version: int) -> Dict:
+        current = self.get_catalog_version()
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT MIN(version) FROM catalog_changes
+        ''')
+        oldest = cursor.fetchone()[0]
+        floor = oldest - 1 if oldest is not None else current
+        if version < floor or version > current:
+            return {"version": current, "resync": True}
+
+        cursor.execute('''
+        SELECT DISTINCT course_name FROM catalog_changes WHERE version > ?
+        ''', (version,))
+        changed = [row[0] for row in cursor.fetchall()]
+        courses = self.get_courses(changed) if changed else []
+        present = {course["course_name"] for course in courses}
+        return {"version": current,
+                "courses": courses,
+                "deleted": [name for name in changed if name not in present]}
+
+    def get_courses(self, course_names: Optional[List[str]] = None) -> List[Dict]:
+        cursor = self.conn.cursor()
+        if course_names is None:
+            cursor.execute('''
+            SELECT course_name, capacity, remaining, schedule, students
+            FROM courses
+            ''')
+        else:
+            placeholders = ','.join(['?' for _ in course_names])
+            cursor.execute(f'''
+            SELECT course_name, capacity, remaining, schedule, students
+            FROM courses WHERE course_name IN ({placeholders})
+            ''', course_names)
         
         courses = []
         for row in cursor.fetchall():
@@ -243,6 +323,13 @@ class AUBRegistrarDatabase:
         result = cursor.fetchone()
         return json.loads(result[0]) if result else []
 
+    def get_student_usernames(self) -> List[str]:
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT username FROM students
+        ''')
+        return [row[0] for row in cursor.fetchall()]
+
     def authenticate(self, username: str, password: str) -> Optional[str]:
         cursor = self.conn.cursor()
         
@@ -261,3 +348,28 @@ class AUBRegistrarDatabase:
             return "student"
         
         return None
+
+    def save_registration_window(self, cohort: str, start: float,
+                                 usernames: List[str]) -> None:
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        INSERT OR REPLACE INTO registration_windows (cohort, start, usernames)
+        VALUES (?, ?, ?)
+        ''', (cohort, start, json.dumps(list(usernames))))
+        self.conn.commit()
+
+    def delete_registration_window(self, cohort: str) -> bool:
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        DELETE FROM registration_windows WHERE cohort = ?
+        ''', (cohort,))
+        self.conn.commit()
+        return cursor.rowcount > 0
+
+    def get_registration_windows(self) -> List[Dict]:
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT cohort, start, usernames FROM registration_windows
+        ''')
+        return [{"cohort": row[0], "start": row[1], "usernames": json.loads(row[2])}
+                for row in cursor.fetchall()]
@@ -0,0 +1,211 @@
+import threading
+from collections import deque
+from typing import List, Dict, Optional
+
+from storage import CHANGE_LOG_SIZE, RegistrarStorage, to_capacity
+
+
+class _Course:
+    __slots__ = ("capacity", "remaining", "schedule", "students", "lock")
+
+    def __init__(self, capacity: int, schedule: str):
+        self.capacity = capacity
+        self.remaining = capacity
+        self.schedule = schedule
+        self.students = {}  # insertion-ordered set of usernames
+        self.lock = threading.Lock()
+
+
+class _Student:
+    __slots__ = ("password", "full_name", "registered_courses", "lock")
+
+    def __init__(self, password: str, full_name: str):
+        self.password = password
+        self.full_name = full_name
+        self.registered_courses = {}  # insertion-ordered set of course names
+        self.lock = threading.Lock()
+
+
+class InMemoryRegistrarDatabase(RegistrarStorage):
+    """
+    Dict-backed storage engine with the same behaviour as AUBRegistrarDatabase.
+    Nothing touches the filesystem, so it is meant for tests, benchmarks and
+    load runs. One instance is shared by every client thread.
+
+    Locking: the catalog lock only guards inserting new students/courses.
+    register/withdraw take the student's lock, then the course's lock (always
+    in that order) so two students can enroll in different courses in parallel.
+    The version lock (catalog change log) is always taken last.
+    """
+
+    def __init__(self):
+        self._catalog_lock = threading.Lock()
+        self._courses: Dict[str, _Course] = {}
+        self._students: Dict[str, _Student] = {}
+        self._admins: Dict[str, str] = {"admin": "admin123"}
+        self._version_lock = threading.Lock()
+        self._version = 0
+        self._changes = deque(maxlen=CHANGE_LOG_SIZE)  # (version, course_name)
+        self._windows: Dict[str, Dict] = {}  # cohort -> saved registration window
+
+    def _record_change(self, course_name: str) -> None:
+        with self._version_lock:
+            self._version += 1
+            self._changes.append((self._version, course_name))
+
+    def add_student(self, username: str, password: str, full_name: str) -> bool:
+        # Same NOT NULL columns as the SQLite students table
+        if username is None or password is None or full_name is None:
+            return False
+        with self._catalog_lock:
+            if username in self._students:
+                return False
+            self._students[username] = _Student(password, full_name)
+            return True
+
+    def create_course(self, course_name: str, capacity: int, schedule: str) -> bool:
+        capacity = to_capacity(capacity)
+        if course_name is None or capacity is None or schedule is None:
+            return False
+        with self._catalog_lock:
+            if course_name in self._courses:
+                return False
+            self._courses[course_name] = _Course(capacity, schedule)
+            self._record_change(course_name)
+            return True
+
+    def update_course_capacity(self, course_name: str, new_capacity: int) -> bool:
+        new_capacity = to_capacity(new_capacity)
+        course = self._courses.get(course_name)
+        if course is None or new_capacity is None:
+            return False
+
+        with course.lock:
+            if new_capacity < course.capacity:
+                return False
+            # Compute everything first so a failure cannot leave half an update
+            remaining = new_capacity - len(course.students)
+            course.capacity, course.remaining = new_capacity, remaining
+            self._record_change(course_name)
+            return True
+
+    def register_course(self, username: str, course_name: str) -> bool:
+        course = self._courses.get(course_name)
+        if course is None or course.remaining <= 0:
+            return False
+
+        student = self._students.get(username)
+        if student is None:
+            return False
+
+        with student.lock, course.lock:
+            if course.remaining <= 0:
+                return False
+            if len(student.registered_courses) >= 5:
+                return False
+
+            # Same-schedule check also rejects registering twice for a course
+            for existing in student.registered_courses:
+                if self._courses[existing].schedule == course.schedule:
+                    return False
+
+            course.students[username] = None
+            course.remaining -= 1
+            student.registered_courses[course_name] = None
+            self._record_change(course_name)
+            return True
+
+    def withdraw_course(self, username: str, course_name: str) -> bool:
+        course = self._courses.get(course_name)
+        if course is None:
+            return False
+
+        student = self._students.get(username)
+        if student is None:
+            return False
+
+        with student.lock, course.lock:
+            if course_name not in student.registered_courses:
+                return False
+
+            del course.students[username]
+            course.remaining += 1
+            del student.registered_courses[course_name]
+            self._record_change(course_name)
+            return True
+
+    @staticmethod
+    def _course_dict(course_name: str, course: _Course) -> Dict:
+        with course.lock:
+            return {
+                "course_name": course_name,
+                "capacity": course.capacity,
+                "remaining": course.remaining,
+                "schedule": course.schedule,
+                "students": list(course.students)
+            }
+
+    def get_courses(self) -> List[Dict]:
+        return [self._course_dict(course_name, course)
+                for course_name, course in list(self._courses.items())]
+
+    def get_catalog_version(self) -> int:
+        return self._version
+
+    def get_courses_since(self, version: int) -> Dict:
+        with self._version_lock:
+            current = self._version
+            floor = self._changes[0][0] - 1 if self._changes else current
+            if version < floor or version > current:
+                return {"version": current, "resync": True}
+            # Walk back from the newest entry so the cost follows the churn
+            recent = []
+            for change_version, course_name in reversed(self._changes):
+                if change_version <= version:
+                    break
+                recent.append(course_name)
+            changed = list(dict.fromkeys(reversed(recent)))
+
+        courses, deleted = [], []
+        for course_name in changed:
+            course = self._courses.get(course_name)
+            if course is None:
+                deleted.append(course_name)
+            else:
+                courses.append(self._course_dict(course_name, course))
+        return {"version": current, "courses": courses, "deleted": deleted}
+
+    def get_student_courses(self, username: str) -> List[str]:
+        student = self._students.get(username)
+        if student is None:
+            return []
+        with student.lock:
+            return list(student.registered_courses)
+
+    def get_student_usernames(self) -> List[str]:
+        return list(self._students)
+
+    def authenticate(self, username: str, password: str) -> Optional[str]:
+        if username in self._admins and self._admins[username] == password:
+            return "admin"
+
+        student = self._students.get(username)
+        if student is not None and student.password == password:
+            return "student"
+
+        return None
+
+    def save_registration_window(self, cohort: str, start: float,
+                                 usernames: List[str]) -> None:
+        with self._catalog_lock:
+            self._windows[cohort] = {"cohort": cohort, "start": start,
+                                     "usernames": list(usernames)}
+
+    def delete_registration_window(self, cohort: str) -> bool:
+        with self._catalog_lock:
+            return self._windows.pop(cohort, None) is not None
+
+    def get_registration_windows(self) -> List[Dict]:
+        with self._catalog_lock:
+            return [dict(window, usernames=list(window["usernames"]))
+                    for window in self._windows.values()]
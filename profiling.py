@@ -0,0 +1,170 @@
+import cProfile
+import io
+import pstats
+import threading
+import time
+import tracemalloc
+from typing import Dict, Optional
+
+
+class ProfilingHooks:
+    """
+    On-demand diagnostics for a live AUBRegistrarServer.
+
+    - Sampling window: cProfile every request for the next N requests and/or
+      S seconds, grouped by command. Only one cProfile can run at a time, so
+      profiled requests are serialised on their own lock; the bookkeeping
+      lock is never held while a request runs, so report()/start() called
+      from another request cannot deadlock against it.
+    - Memory tracing: tracemalloc baseline snapshot, then a diff of the top
+      allocation sites against it. The diff stops tracing unless asked not to.
+      While tracing is on, profiled requests also record their own top
+      allocation sites (two extra snapshots per request), so the report
+      shows where each command allocates.
+
+    When neither is switched on the server only reads `self.active`, and
+    tracemalloc is not tracing, so the hooks can stay in production.
+    """
+
+    TOP_FUNCTIONS = 10
+    TOP_ALLOCATIONS = 20
+    TOP_COMMAND_SITES = 5
+    # Keep tracemalloc's own bookkeeping out of per-command allocation sites
+    SNAPSHOT_FILTERS = (tracemalloc.Filter(False, tracemalloc.__file__),
+                        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"))
+
+    def __init__(self):
+        self.active = False
+        self._lock = threading.Lock()          # guards the counters below
+        self._profile_lock = threading.Lock()  # one cProfile at a time
+        self._generation = 0                   # bumped by start()
+        self._requests_left: Optional[int] = None
+        self._deadline: Optional[float] = None
+        self._started_at: Optional[float] = None
+        self._stats: Dict[str, pstats.Stats] = {}
+        self._calls: Dict[str, int] = {}
+        self._allocated: Dict[str, int] = {}
+        self._sites: Dict[str, Dict[str, int]] = {}  # command -> site -> bytes
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+
+    # ------------------------------------------------------------------
+    # cProfile window
+    def start(self, requests: Optional[int] = None, seconds: Optional[float] = None) -> None:
+        if requests is None and seconds is None:
+            requests = 100
+        with self._lock:
+            self._requests_left = requests
+            self._deadline = time.monotonic() + seconds if seconds is not None else None
+            self._started_at = time.time()
+            self._stats = {}
+            self._calls = {}
+            self._allocated = {}
+            self._sites = {}
+            self._generation += 1
+            self.active = True
+
+    def run(self, command: str, func, *args):
+        """Call func(*args) under cProfile and fold the result into the report."""
+        # Reserve a slot in the window, then release the lock before running
+        with self._lock:
+            if not self._still_open():
+                return func(*args)
+            if self._requests_left is not None:
+                self._requests_left -= 1
+            generation = self._generation
+
+        with self._profile_lock:
+            profile = cProfile.Profile()
+            before = self._take_snapshot()
+            try:
+                return profile.runcall(func, *args)
+            finally:
+                after = self._take_snapshot() if before is not None else None
+                # Both snapshots exclude tracemalloc's own frames, so the diff
+                # only holds what the request itself allocated
+                diff = after.compare_to(before, "lineno") if after is not None else None
+                with self._lock:
+                    # A start() while this request ran opened a new window; drop it
+                    if generation == self._generation:
+                        if diff is not None:
+                            allocated = sum(stat.size_diff for stat in diff)
+                            self._allocated[command] = self._allocated.get(command, 0) + allocated
+                            sites = self._sites.setdefault(command, {})
+                            for stat in diff[:self.TOP_COMMAND_SITES]:
+                                if stat.size_diff:
+                                    site = str(stat.traceback)
+                                    sites[site] = sites.get(site, 0) + stat.size_diff
+                        self._calls[command] = self._calls.get(command, 0) + 1
+                        if command in self._stats:
+                            self._stats[command].add(profile)
+                        else:
+                            self._stats[command] = pstats.Stats(profile)
+
+    def _take_snapshot(self) -> Optional[tracemalloc.Snapshot]:
+        if not tracemalloc.is_tracing():
+            return None
+        return tracemalloc.take_snapshot().filter_traces(self.SNAPSHOT_FILTERS)
+
+    def _still_open(self) -> bool:
+        """Must be called with self._lock held; closes the window once it has run out."""
+        if not self.active:
+            return False
+        if ((self._requests_left is not None and self._requests_left <= 0) or
+                (self._deadline is not None and time.monotonic() >= self._deadline)):
+            self.active = False
+        return self.active
+
+    def report(self, stop: bool = True) -> str:
+        with self._lock:
+            if stop:
+                self.active = False
+            if self._started_at is None:
+                return "No profiling window has been started."
+
+            out = io.StringIO()
+            started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self._started_at))
+            out.write(f"Profiling window started {started}, "
+                      f"{sum(self._calls.values())} request(s) captured\n")
+            for command in sorted(self._calls, key=self._calls.get, reverse=True):
+                out.write("=" * 80 + "\n")
+                out.write(f"Command: {command}   calls: {self._calls[command]}")
+                if command in self._allocated:
+                    out.write(f"   net allocated: {self._allocated[command]} B")
+                out.write("\n")
+                sites = self._sites.get(command)
+                if sites:
+                    out.write("Top allocation sites:\n")
+                    for site in sorted(sites, key=lambda site: abs(sites[site]),
+                                       reverse=True)[:self.TOP_COMMAND_SITES]:
+                        out.write(f"  {site}: {sites[site]:+d} B\n")
+                stats = self._stats[command]
+                stats.stream = out
+                stats.sort_stats("cumulative").print_stats(self.TOP_FUNCTIONS)
+            return out.getvalue()
+
+    # ------------------------------------------------------------------
+    # tracemalloc
+    def memory_snapshot(self) -> None:
+        """Start tracing (if needed) and take the baseline for memory_diff."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._baseline = tracemalloc.take_snapshot()
+
+    def memory_diff(self, stop: bool = True) -> str:
+        """Diff against the baseline; stops tracing unless stop=False."""
+        if self._baseline is None or not tracemalloc.is_tracing():
+            return "No memory snapshot has been taken."
+
+        current = tracemalloc.take_snapshot()
+        diff = current.compare_to(self._baseline, "lineno")
+        size, peak = tracemalloc.get_traced_memory()
+        if stop:
+            tracemalloc.stop()
+            self._baseline = None
+
+        out = io.StringIO()
+        out.write(f"Traced memory: current {size} B, peak {peak} B\n")
+        out.write(f"Top {self.TOP_ALLOCATIONS} allocation sites since snapshot:\n")
+        for stat in diff[:self.TOP_ALLOCATIONS]:
+            out.write(f"{stat}\n")
+        return out.getvalue()
@@ -0,0 +1,432 @@
+"""
+Client core shared by the student and admin portals and by automation scripts.
+
+- RegistrarClient: blocking client with connect/read timeouts, automatic
+  reconnect with jittered exponential backoff, session resume (the last
+  successful login is replayed on a new connection) and pipelining.
+  Replies carrying a retry_after hint (registration window not open) are
+  returned as-is; with wait_for_window=True the request is instead held
+  back until the hint (plus jitter so waiting clients do not all arrive in
+  the same instant) and sent again, and the server's answer then decides.
+- AsyncRegistrarClient: the same features on asyncio; concurrent request()
+  calls share one connection and are matched to replies by request_id.
+- RegistrarClientPool: a fixed-size pool of RegistrarClient for bulk callers.
+- CatalogCache: local copy of the course catalog kept current with deltas.
+
+Wire format: one JSON object per line. Every request carries a request_id
+that the server echoes back, so replies can be matched even out of order.
+"""
+import asyncio
+import itertools
+import json
+import queue
+import random
+import select
+import socket
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Commands that are safe to resend if the connection drops after sending them.
+# Anything else (register/withdraw/create...) might already have been applied.
+IDEMPOTENT_COMMANDS = {"login", "list_courses", "list_courses_since",
+                       "get_registered_courses"}
+
+
+class RegistrarConnectionError(ConnectionError):
+    """The server could not be reached, or the reply was lost."""
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """Exponential backoff with +/-50% jitter so reconnecting clients spread out."""
+    return min(maximum, base * (2 ** attempt)) * random.uniform(0.5, 1.5)
+
+
+class _ClientBase:
+    def __init__(self, host: str = 'localhost', port: int = 5000,
+                 connect_timeout: float = 5.0, read_timeout: float = 10.0,
+                 max_retries: int = 5, backoff_base: float = 0.2,
+                 backoff_max: float = 5.0, wait_for_window: bool = False,
+                 window_jitter: float = 1.0):
+        self.host = host
+        self.port = port
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.wait_for_window = wait_for_window
+        self.window_jitter = window_jitter
+        self._ids = itertools.count(1)
+        self._credentials: Optional[Tuple[str, str]] = None
+        self._not_before: Dict[Tuple, float] = {}  # (command, username) -> time.time()
+
+    def _prepare(self, request: Dict) -> Dict:
+        request = dict(request)
+        request["request_id"] = next(self._ids)
+        return request
+
+    def _remember_login(self, request: Dict, response: Dict) -> None:
+        if request.get("command") == "login" and response.get("status") == "success":
+            self._credentials = (request.get("username"), request.get("password"))
+
+    @staticmethod
+    def _window_key(request: Dict) -> Tuple:
+        return request.get("command"), request.get("username")
+
+    def _window_delay(self, request: Dict) -> Optional[float]:
+        """Seconds until this request may be sent, or None if it may go now."""
+        key = self._window_key(request)
+        not_before = self._not_before.get(key)
+        if not_before is None:
+            return None
+        delay = not_before - time.time()
+        if delay <= 0:
+            self._not_before.pop(key, None)
+            return None
+        return delay
+
+    def _note_window(self, request: Dict, response: Dict) -> bool:
+        """
+        Record the server's retry_after hint as a pacing floor for
+        wait_for_window; any reply without one clears it. Only the server
+        ever rejects a request, so moving a window earlier takes effect on
+        the next round trip.
+        """
+        key = self._window_key(request)
+        if "retry_after" not in response:
+            self._not_before.pop(key, None)
+            return False
+        self._not_before[key] = (
+            time.time() + response["retry_after"] + random.uniform(0, self.window_jitter))
+        return True
+
+    def _login_request(self) -> Dict:
+        username, password = self._credentials
+        return {"command": "login", "username": username, "password": password}
+
+    @staticmethod
+    def _encode(requests: Iterable[Dict]) -> bytes:
+        return "".join(json.dumps(request) + "\n" for request in requests).encode()
+
+
+class RegistrarClient(_ClientBase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sock: Optional[socket.socket] = None
+        self._buffer = b""
+        self._unclaimed: Dict[int, Dict] = {}
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def connected(self) -> bool:
+        return self._sock is not None
+
+    def connect(self) -> None:
+        """Open the connection, retrying with backoff; resume the session if logged in."""
+        self.close()
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._sock = socket.create_connection((self.host, self.port),
+                                                      timeout=self.connect_timeout)
+                self._sock.settimeout(self.read_timeout)
+                break
+            except OSError as e:
+                if attempt == self.max_retries:
+                    raise RegistrarConnectionError(f"Cannot connect to server: {e}") from e
+                time.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max))
+
+        if self._credentials:
+            try:
+                self._exchange([self._prepare(self._login_request())])
+            except (OSError, ValueError) as e:
+                self.close()
+                raise RegistrarConnectionError(f"Cannot resume session: {e}") from e
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
+                self._buffer = b""
+                self._unclaimed.clear()
+
+    def _stale(self) -> bool:
+        """True if the server has closed this connection (e.g. it was restarted)."""
+        readable, _, _ = select.select([self._sock], [], [], 0)
+        if not readable:
+            return False
+        try:
+            return self._sock.recv(1, socket.MSG_PEEK) == b""
+        except OSError:
+            return True
+
+    def _read_reply(self) -> Dict:
+        while b"\n" not in self._buffer:
+            chunk = self._sock.recv(4096)
+            if not chunk:
+                raise RegistrarConnectionError("Server closed the connection")
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        return json.loads(line.decode())
+
+    def _exchange(self, requests: List[Dict]) -> List[Dict]:
+        """Send every request, then collect one reply per request_id."""
+        self._sock.sendall(self._encode(requests))
+        wanted = [request["request_id"] for request in requests]
+        while not all(request_id in self._unclaimed for request_id in wanted):
+            response = self._read_reply()
+            self._unclaimed[response.get("request_id")] = response
+        return [self._unclaimed.pop(request_id) for request_id in wanted]
+
+    def pipeline(self, requests: Iterable[Dict]) -> List[Dict]:
+        """
+        Send several requests back to back and return the replies in the same
+        order. Reconnects and resends only if every request is idempotent.
+        """
+        requests = [self._prepare(request) for request in requests]
+        retry_safe = all(r.get("command") in IDEMPOTENT_COMMANDS for r in requests)
+
+        for attempt in range(self.max_retries + 1):
+            # A connection the server already closed is replaced before sending
+            if self._sock is None or self._stale():
+                self.connect()
+            try:
+                responses = self._exchange(requests)
+                for request, response in zip(requests, responses):
+                    self._remember_login(request, response)
+                return responses
+            except (OSError, ValueError) as e:
+                self.close()
+                if not retry_safe or attempt == self.max_retries:
+                    raise RegistrarConnectionError(f"Request failed: {e}") from e
+                time.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max))
+
+    def request(self, request: Dict) -> Dict:
+        delay = self._window_delay(request) if self.wait_for_window else None
+        if delay is not None:
+            time.sleep(delay)
+
+        response = self.pipeline([request])[0]
+        if self._note_window(request, response) and self.wait_for_window:
+            return self.request(request)
+        return response
+
+
+class AsyncRegistrarClient(_ClientBase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._connect_lock: Optional[asyncio.Lock] = None
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self) -> None:
+        await self.close()
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._reader, self._writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port),
+                    self.connect_timeout)
+                break
+            except (OSError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise RegistrarConnectionError(f"Cannot connect to server: {e}") from e
+                await asyncio.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max))
+
+        self._reader_task = asyncio.ensure_future(self._read_replies())
+        if self._credentials:
+            try:
+                await self._send(self._prepare(self._login_request()))
+            except (OSError, asyncio.TimeoutError) as e:
+                await self.close()
+                raise RegistrarConnectionError(f"Cannot resume session: {e}") from e
+
+    async def close(self) -> None:
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._fail_pending(RegistrarConnectionError("Connection closed"))
+
+    def _fail_pending(self, error: Exception) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+    async def _read_replies(self) -> None:
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                response = json.loads(line.decode())
+                future = self._pending.pop(response.get("request_id"), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except (OSError, ValueError):
+            pass
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._fail_pending(RegistrarConnectionError("Server closed the connection"))
+
+    async def _send(self, request: Dict) -> Dict:
+        # _read_replies drops the writer when the server hangs up, which can
+        # happen between _ensure_connected() and this call
+        if self._writer is None:
+            raise RegistrarConnectionError("Server closed the connection")
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request["request_id"]] = future
+        self._writer.write(self._encode([request]))
+        await self._writer.drain()
+        return await asyncio.wait_for(future, self.read_timeout)
+
+    async def _ensure_connected(self) -> None:
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if not self.connected:
+                await self.connect()
+
+    async def request(self, request: Dict) -> Dict:
+        delay = self._window_delay(request) if self.wait_for_window else None
+        if delay is not None:
+            await asyncio.sleep(delay)
+
+        response = await self._request_now(request)
+        if self._note_window(request, response) and self.wait_for_window:
+            return await self.request(request)
+        return response
+
+    async def _request_now(self, request: Dict) -> Dict:
+        request = self._prepare(request)
+        retry_safe = request.get("command") in IDEMPOTENT_COMMANDS
+
+        for attempt in range(self.max_retries + 1):
+            await self._ensure_connected()
+            try:
+                response = await self._send(request)
+                self._remember_login(request, response)
+                return response
+            except (OSError, asyncio.TimeoutError) as e:
+                self._pending.pop(request["request_id"], None)
+                if not retry_safe or attempt == self.max_retries:
+                    raise RegistrarConnectionError(f"Request failed: {e}") from e
+                await asyncio.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max))
+
+    async def pipeline(self, requests: Iterable[Dict]) -> List[Dict]:
+        return list(await asyncio.gather(*(self.request(request) for request in requests)))
+
+
+class CatalogCache:
+    """
+    Local course catalog. The first refresh downloads everything with
+    list_courses; later ones ask list_courses_since for the courses changed
+    after the cached version, falling back to a full download when the
+    server answers with a resync marker.
+    """
+
+    def __init__(self):
+        self.version: Optional[int] = None
+        self._courses: Dict[str, Dict] = {}
+
+    def courses(self) -> List[Dict]:
+        return list(self._courses.values())
+
+    def _next_request(self) -> Dict:
+        if self.version is None:
+            return {"command": "list_courses"}
+        return {"command": "list_courses_since", "version": self.version}
+
+    def refresh(self, send) -> Dict:
+        """Bring the cache up to date using send(request) -> response."""
+        response = send(self._next_request())
+        if response.get("status") == "success" and response.get("resync"):
+            self.version = None
+            response = send(self._next_request())
+        if response.get("status") != "success":
+            return response
+
+        if "deleted" not in response:  # full list_courses reply
+            self._courses = {}
+        for course in response.get("courses", []):
+            self._courses[course["course_name"]] = course
+        for course_name in response.get("deleted", []):
+            self._courses.pop(course_name, None)
+        # Servers without catalog versions leave this None: always full lists
+        self.version = response.get("version")
+        return response
+
+
+class RegistrarClientPool:
+    """
+    Fixed number of RegistrarClient connections, opened lazily. If `login` is
+    given as (username, password) every connection logs in before first use.
+    """
+
+    def __init__(self, host: str = 'localhost', port: int = 5000, size: int = 4,
+                 login: Optional[Tuple[str, str]] = None, **client_kwargs):
+        self.host = host
+        self.port = port
+        self.login = login
+        self.client_kwargs = client_kwargs
+        self._idle: "queue.LifoQueue[Optional[RegistrarClient]]" = queue.LifoQueue()
+        for _ in range(size):
+            self._idle.put(None)
+        self._clients: List[RegistrarClient] = []
+
+    def _new_client(self) -> RegistrarClient:
+        client = RegistrarClient(self.host, self.port, **self.client_kwargs)
+        client.connect()
+        if self.login:
+            username, password = self.login
+            response = client.request({"command": "login",
+                                       "username": username, "password": password})
+            if response.get("status") != "success":
+                client.close()
+                raise RegistrarConnectionError("Pool login failed")
+        self._clients.append(client)
+        return client
+
+    @contextmanager
+    def client(self, timeout: Optional[float] = None):
+        """Borrow a connection for a block of requests."""
+        client = self._idle.get(timeout=timeout)
+        try:
+            if client is None:
+                client = self._new_client()
+            yield client
+        finally:
+            self._idle.put(client)
+
+    def request(self, request: Dict) -> Dict:
+        with self.client() as client:
+            return client.request(request)
+
+    def close(self) -> None:
+        for client in self._clients:
+            client.close()
+        self._clients.clear()
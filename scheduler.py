@@ -0,0 +1,110 @@
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Commands held back until the student's registration window opens
+GATED_COMMANDS = {"register_course", "withdraw_course"}
+DEFAULT_COHORT = "(everyone else)"
+
+
+def parse_start(value) -> float:
+    """Accept an epoch timestamp or an ISO date/time string (local time)."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.fromisoformat(str(value)).timestamp()
+
+
+class RegistrationScheduler:
+    """
+    Registration windows by priority cohort. Admins assign usernames to named
+    cohorts with a start time; students in no cohort use the default start
+    (None means no restriction). A student listed in several cohorts gets the
+    earliest start.
+
+    retry_at() is a single dict lookup, so rejecting early arrivals costs
+    almost nothing compared with a database round trip. The server saves
+    every window through the storage engine and calls load() at startup;
+    this class only holds the in-memory lookup.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cohorts: Dict[str, Tuple[float, frozenset]] = {}
+        self._window: Dict[str, Tuple[float, str]] = {}  # username -> (start, cohort)
+        self.default_start: Optional[float] = None
+
+    def _rebuild(self) -> None:
+        """Recompute the username lookup; called with self._lock held."""
+        window = {}
+        for cohort, (start, usernames) in self._cohorts.items():
+            for username in usernames:
+                if username not in window or start < window[username][0]:
+                    window[username] = (start, cohort)
+        self._window = window  # swapped in whole so readers never need the lock
+
+    def load(self, windows: Iterable[Dict]) -> None:
+        """Replace every window with saved ones; DEFAULT_COHORT sets the default."""
+        with self._lock:
+            self._cohorts = {}
+            self.default_start = None
+            for window in windows:
+                if window["cohort"] == DEFAULT_COHORT:
+                    self.default_start = window["start"]
+                else:
+                    self._cohorts[window["cohort"]] = (window["start"],
+                                                       frozenset(window["usernames"]))
+            self._rebuild()
+
+    def set_cohort(self, cohort: str, start: float, usernames: Iterable[str]) -> None:
+        with self._lock:
+            self._cohorts[cohort] = (start, frozenset(usernames))
+            self._rebuild()
+
+    def remove_cohort(self, cohort: str) -> bool:
+        with self._lock:
+            if self._cohorts.pop(cohort, None) is None:
+                return False
+            self._rebuild()
+            return True
+
+    def set_default_start(self, start: Optional[float]) -> None:
+        self.default_start = start
+
+    def retry_at(self, username: str, now: Optional[float] = None) -> Optional[float]:
+        """Start of the student's window if it has not opened yet, else None."""
+        entry = self._window.get(username)
+        start = entry[0] if entry else self.default_start
+        if start is None:
+            return None
+        if (now if now is not None else time.time()) >= start:
+            return None
+        return start
+
+    def admissions(self, students: Iterable[str]) -> List[Dict]:
+        """
+        Students admitted by each window, in opening order, with running totals.
+        Only names in `students` are counted, so a cohort listing someone who
+        is not (or no longer) a student does not inflate its window.
+        """
+        with self._lock:
+            counts = {cohort: 0 for cohort in self._cohorts}
+            default = 0
+            for username in students:
+                entry = self._window.get(username)
+                if entry is None:
+                    default += 1
+                else:
+                    counts[entry[1]] += 1
+            windows = [{"cohort": cohort, "start": start, "students": counts[cohort]}
+                       for cohort, (start, _) in self._cohorts.items()]
+            windows.append({"cohort": DEFAULT_COHORT, "start": self.default_start,
+                            "students": default})
+
+        # A window with no start (open now) sorts first
+        windows.sort(key=lambda window: window["start"] or 0)
+        admitted = 0
+        for window in windows:
+            admitted += window["students"]
+            window["cumulative"] = admitted
+        return windows
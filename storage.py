@@ -0,0 +1,131 @@
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+
+# How many catalog changes an engine remembers for get_courses_since; clients
+# further behind than this are told to resync the full catalog.
+CHANGE_LOG_SIZE = 1000
+
+
+def to_capacity(value) -> Optional[int]:
+    """
+    Normalise a course capacity the way every engine stores it: a
+    non-negative int. Integer strings such as "3" and integral floats are
+    converted (SQLite's INTEGER column affinity always did this); anything
+    else -- None, booleans, other text -- gives None, meaning "reject".
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        capacity = value
+    elif isinstance(value, float) and value.is_integer():
+        capacity = int(value)
+    elif isinstance(value, str):
+        try:
+            capacity = int(value.strip())
+        except ValueError:
+            return None
+    else:
+        return None
+    return capacity if capacity >= 0 else None
+
+
+class RegistrarStorage(ABC):
+    """
+    Everything AUBRegistrarServer.process_request needs from a storage engine.
+    Engines are used as context managers: the server enters one per client
+    connection and calls the methods below while it is open.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    @abstractmethod
+    def add_student(self, username: str, password: str, full_name: str) -> bool:
+        ...
+
+    @abstractmethod
+    def create_course(self, course_name: str, capacity: int, schedule: str) -> bool:
+        ...
+
+    @abstractmethod
+    def update_course_capacity(self, course_name: str, new_capacity: int) -> bool:
+        ...
+
+    @abstractmethod
+    def register_course(self, username: str, course_name: str) -> bool:
+        ...
+
+    @abstractmethod
+    def withdraw_course(self, username: str, course_name: str) -> bool:
+        ...
+
+    @abstractmethod
+    def get_courses(self) -> List[Dict]:
+        ...
+
+    @abstractmethod
+    def get_catalog_version(self) -> int:
+        """Version of the course catalog; every course mutation increases it."""
+
+    @abstractmethod
+    def get_courses_since(self, version: int) -> Dict:
+        """
+        Courses changed after `version`, as
+        {"version": current, "courses": [...], "deleted": [names]}, or
+        {"version": current, "resync": True} when the change log no longer
+        reaches back that far (or `version` is from the future, e.g. after a
+        restart of the in-memory engine).
+        """
+
+    @abstractmethod
+    def get_student_courses(self, username: str) -> List[str]:
+        ...
+
+    @abstractmethod
+    def get_student_usernames(self) -> List[str]:
+        ...
+
+    @abstractmethod
+    def authenticate(self, username: str, password: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def save_registration_window(self, cohort: str, start: float,
+                                 usernames: List[str]) -> None:
+        """Insert or replace a cohort's registration window."""
+
+    @abstractmethod
+    def delete_registration_window(self, cohort: str) -> bool:
+        ...
+
+    @abstractmethod
+    def get_registration_windows(self) -> List[Dict]:
+        """Every saved window as {"cohort", "start", "usernames"}."""
+
+
+BACKENDS = ("sqlite", "memory")
+
+
+def storage_factory(backend: str = "sqlite",
+                    db_name: str = "aub_registrar.db") -> Callable[[], RegistrarStorage]:
+    """
+    Return a zero-argument callable that hands out a storage engine for one
+    client connection.
+
+    - "sqlite": a fresh AUBRegistrarDatabase (own connection) per call.
+    - "memory": the same InMemoryRegistrarDatabase every call, so all
+      connections share one catalog that lives as long as the server.
+    """
+    if backend == "sqlite":
+        from database import AUBRegistrarDatabase
+        return lambda: AUBRegistrarDatabase(db_name)
+
+    if backend == "memory":
+        from memory_database import InMemoryRegistrarDatabase
+        shared = InMemoryRegistrarDatabase()
+        return lambda: shared
+
+    raise ValueError(f"Unknown storage backend: {backend!r}")
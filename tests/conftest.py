@@ -0,0 +1,39 @@
+import os
+import socket
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Server import AUBRegistrarServer
+
+
+@pytest.fixture
+def memory_server():
+    """An AUBRegistrarServer on an ephemeral port with in-memory storage, accepting in a thread."""
+    server = AUBRegistrarServer(0, "memory")
+    server.port = server.server_socket.getsockname()[1]
+
+    def serve():
+        try:
+            server.start()
+        except OSError:
+            pass  # accept() fails once teardown closes the listening socket
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    yield server
+    # shutdown() wakes the blocked accept(); close() alone does not on Linux
+    try:
+        server.server_socket.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    server.server_socket.close()
+    thread.join(1)
+
+
+@pytest.fixture
+def admin_session():
+    return {"username": "admin", "role": "admin"}
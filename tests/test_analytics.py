@@ -0,0 +1,159 @@
+"""The incremental counters must always equal a full recomputation from storage."""
+import random
+
+import pytest
+
+from analytics import (FULL_LOAD, FILL_BUCKETS, NEAR_FULL_RATIO, EnrollmentAnalytics,
+                       _fill_bucket)
+from Server import AUBRegistrarServer
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def server(request, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # the sqlite backend writes aub_registrar.db to the cwd
+    server = AUBRegistrarServer(0, request.param)
+    yield server
+    server.server_socket.close()
+
+
+def recompute(db):
+    courses = db.get_courses()
+
+    fill_rates = {bucket: 0 for bucket in FILL_BUCKETS}
+    full, near_full, slots = [], [], {}
+    for course in courses:
+        capacity, enrolled = course["capacity"], len(course["students"])
+        fill_rates[_fill_bucket(capacity, enrolled)] += 1
+        if enrolled >= capacity:
+            full.append(course["course_name"])
+        elif enrolled >= capacity * NEAR_FULL_RATIO:
+            near_full.append(course["course_name"])
+        slot = slots.setdefault(course["schedule"], {"enrolled": 0, "capacity": 0})
+        slot["enrolled"] += enrolled
+        slot["capacity"] += capacity
+
+    distribution = {}
+    for username in db.get_student_usernames():
+        count = len(db.get_student_courses(username))
+        distribution[count] = distribution.get(count, 0) + 1
+
+    return {
+        "fill_rates": fill_rates,
+        "full_courses": {"full": sorted(full), "near_full": sorted(near_full)},
+        "slot_demand": slots,
+        "student_loads": {
+            "distribution": dict(sorted(distribution.items())),
+            "below_full_load": sum(n for count, n in distribution.items() if count < FULL_LOAD),
+        },
+    }
+
+
+def reports(analytics):
+    return {name: getattr(analytics, name)()
+            for name in ("fill_rates", "full_courses", "slot_demand", "student_loads")}
+
+
+def test_counters_match_recomputation_after_mixed_operations(server):
+    rng = random.Random(350)
+    admin = {"username": "admin", "role": "admin"}
+    students = [f"s{i}" for i in range(15)]
+    courses = [f"C{i}" for i in range(8)]
+
+    with server.open_storage() as db:
+        def send(request):
+            return server.process_request(request, db, admin)
+
+        for username in students:
+            send({"command": "add_student", "student_username": username,
+                  "student_password": "pw", "student_full_name": username})
+        for i, course_name in enumerate(courses):
+            send({"command": "create_course", "course_name": course_name,
+                  "capacity": rng.randint(1, 6), "schedule": f"slot {i % 5}"})
+
+        for step in range(400):
+            action = rng.random()
+            username, course_name = rng.choice(students), rng.choice(courses)
+            if action < 0.55:
+                send({"command": "register_course", "username": username,
+                      "course_name": course_name})
+            elif action < 0.9:
+                send({"command": "withdraw_course", "username": username,
+                      "course_name": course_name})
+            else:
+                current = next(c["capacity"] for c in db.get_courses()
+                               if c["course_name"] == course_name)
+                # Includes rejected decreases, which must leave counters alone
+                send({"command": "update_course", "course_name": course_name,
+                      "new_capacity": current + rng.randint(-1, 2)})
+
+            if step % 20 == 0:
+                assert reports(server.analytics) == recompute(db)
+
+        assert reports(server.analytics) == recompute(db)
+
+
+def test_load_seeds_counters_from_existing_storage(server):
+    with server.open_storage() as db:
+        db.add_student("alice", "pw", "Alice A")
+        db.add_student("bob", "pw", "Bob B")
+        db.create_course("EECE350", 2, "MWF 10:00")
+        db.register_course("alice", "EECE350")
+        db.register_course("bob", "EECE350")
+
+        analytics = EnrollmentAnalytics()
+        analytics.load(db.get_courses(), db.get_student_usernames())
+
+        assert reports(analytics) == recompute(db)
+
+
+def test_string_capacity_is_coerced_before_storage_and_analytics(server):
+    admin = {"username": "admin", "role": "admin"}
+    with server.open_storage() as db:
+        def send(request):
+            return server.process_request(request, db, admin)
+
+        send({"command": "add_student", "student_username": "alice",
+              "student_password": "pw", "student_full_name": "Alice A"})
+        assert send({"command": "create_course", "course_name": "EECE350",
+                     "capacity": "3", "schedule": "MWF 10:00"})["status"] == "success"
+        assert send({"command": "update_course", "course_name": "EECE350",
+                     "new_capacity": "4"})["status"] == "success"
+        assert send({"command": "register_course", "username": "alice",
+                     "course_name": "EECE350"})["status"] == "success"
+
+        assert reports(server.analytics) == recompute(db)
+
+
+@pytest.mark.parametrize("capacity", ["abc", None, 2.5, True, -1])
+def test_invalid_capacity_is_rejected_before_storage(server, capacity):
+    admin = {"username": "admin", "role": "admin"}
+    with server.open_storage() as db:
+        response = server.process_request({"command": "create_course",
+                                           "course_name": "EECE350",
+                                           "capacity": capacity,
+                                           "schedule": "MWF 10:00"}, db, admin)
+        assert response == {"status": "error", "message": "Invalid capacity"}
+        assert db.get_courses() == []
+
+        db.create_course("EECE330", 3, "TR 11:00")
+        response = server.process_request({"command": "update_course",
+                                           "course_name": "EECE330",
+                                           "new_capacity": capacity}, db, admin)
+        assert response == {"status": "error", "message": "Invalid capacity"}
+        assert db.get_courses()[0]["capacity"] == 3
+
+
+def test_failing_analytics_hook_does_not_fail_committed_mutation(server, monkeypatch):
+    def broken(*args):
+        raise RuntimeError("counter bug")
+
+    monkeypatch.setattr(server.analytics, "course_created", broken)
+    admin = {"username": "admin", "role": "admin"}
+    with server.open_storage() as db:
+        response = server.process_request({"command": "create_course",
+                                           "course_name": "EECE350",
+                                           "capacity": 3,
+                                           "schedule": "MWF 10:00"}, db, admin)
+
+        assert response["status"] == "success"
+        assert [c["course_name"] for c in db.get_courses()] == ["EECE350"]
@@ -0,0 +1,107 @@
+import json
+import threading
+import tracemalloc
+
+from profiling import ProfilingHooks
+
+
+def call_with_timeout(func, *args, timeout=5):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("value", func(*args)),
+                              daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "call deadlocked"
+    return result["value"]
+
+
+def test_report_from_inside_profiled_request_does_not_deadlock():
+    hooks = ProfilingHooks()
+    hooks.start(seconds=60)
+
+    report = call_with_timeout(hooks.run, "profile_report", hooks.report)
+
+    assert "Profiling window started" in report
+    assert not hooks.active
+
+
+def test_start_from_inside_profiled_request_does_not_deadlock():
+    hooks = ProfilingHooks()
+    hooks.start(seconds=60)
+
+    call_with_timeout(hooks.run, "profile_start", hooks.start, 3)
+
+    assert hooks.active
+
+
+def test_request_limit_closes_window():
+    hooks = ProfilingHooks()
+    hooks.start(requests=2)
+
+    for _ in range(3):
+        hooks.run("list_courses", lambda: None)
+
+    assert not hooks.active
+    assert "2 request(s) captured" in hooks.report()
+
+
+def test_server_report_while_window_active(memory_server, admin_session):
+    with memory_server.open_storage() as db:
+        def send(request):
+            return memory_server.respond(json.dumps(request).encode(), db, admin_session)
+
+        assert send({"command": "profile_start", "seconds": 60})["status"] == "success"
+        assert send({"command": "list_courses"})["status"] == "success"
+
+        response = call_with_timeout(send, {"command": "profile_report"})
+
+    assert response["status"] == "success"
+    assert "Command: list_courses" in response["report"]
+
+
+def test_memory_diff_stops_tracing_by_default():
+    hooks = ProfilingHooks()
+    hooks.memory_snapshot()
+    try:
+        assert "Traced memory" in hooks.memory_diff(stop=False)
+        assert tracemalloc.is_tracing()
+
+        assert "Traced memory" in hooks.memory_diff()
+        assert not tracemalloc.is_tracing()
+        assert hooks.memory_diff() == "No memory snapshot has been taken."
+    finally:
+        tracemalloc.stop()
+
+
+def test_server_memory_diff_stops_tracing(memory_server, admin_session):
+    with memory_server.open_storage() as db:
+        def send(request):
+            return memory_server.respond(json.dumps(request).encode(), db, admin_session)
+
+        try:
+            assert send({"command": "memory_snapshot"})["status"] == "success"
+            assert send({"command": "memory_diff"})["status"] == "success"
+            assert not tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
+
+
+def test_report_lists_allocation_sites_per_command():
+    hooks = ProfilingHooks()
+    kept = []
+
+    def allocate():
+        kept.append([object() for _ in range(2000)])
+
+    hooks.memory_snapshot()
+    try:
+        hooks.start(seconds=60)
+        hooks.run("register_course", allocate)
+        hooks.run("list_courses", lambda: None)
+        report = hooks.report()
+    finally:
+        tracemalloc.stop()
+
+    register_section = report.split("Command: register_course")[1].split("Command:")[0]
+    assert "Top allocation sites:" in register_section
+    assert f"test_profiling.py:{allocate.__code__.co_firstlineno + 1}" in register_section
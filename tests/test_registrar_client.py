@@ -0,0 +1,271 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from registrar_client import (AsyncRegistrarClient, RegistrarClient, RegistrarClientPool,
+                              RegistrarConnectionError)
+
+
+def connect(server, **kwargs):
+    client = RegistrarClient('localhost', server.port, connect_timeout=2, read_timeout=2,
+                             backoff_base=0.01, **kwargs)
+    client.connect()
+    return client
+
+
+def login_admin(client):
+    assert client.request({"command": "login", "username": "admin",
+                           "password": "admin123"})["status"] == "success"
+
+
+def setup_student_in_window(admin, start):
+    admin.request({"command": "add_student", "student_username": "alice",
+                   "student_password": "pw", "student_full_name": "Alice A"})
+    admin.request({"command": "create_course", "course_name": "EECE350",
+                   "capacity": 10, "schedule": "MWF 10:00"})
+    admin.request({"command": "set_registration_window", "cohort": "seniors",
+                   "start": start, "usernames": ["alice"]})
+
+
+def test_window_hint_does_not_outlive_server_decision(memory_server):
+    admin = connect(memory_server)
+    login_admin(admin)
+    setup_student_in_window(admin, time.time() + 3600)
+
+    student = connect(memory_server)
+    student.request({"command": "login", "username": "alice", "password": "pw"})
+    register = {"command": "register_course", "username": "alice", "course_name": "EECE350"}
+    assert "retry_at" in student.request(register)
+
+    # Moving the window earlier takes effect on the very next request
+    admin.request({"command": "remove_registration_window", "cohort": "seniors"})
+    assert student.request(register)["status"] == "success"
+
+
+def test_wait_for_window_holds_request_until_open(memory_server):
+    admin = connect(memory_server)
+    login_admin(admin)
+    setup_student_in_window(admin, time.time() + 0.5)
+
+    student = connect(memory_server, wait_for_window=True, window_jitter=0.1)
+    student.request({"command": "login", "username": "alice", "password": "pw"})
+    started = time.monotonic()
+    response = student.request({"command": "register_course", "username": "alice",
+                                "course_name": "EECE350"})
+
+    assert response["status"] == "success"
+    assert time.monotonic() - started >= 0.3
+
+
+@pytest.fixture
+def silent_server():
+    """Accepts connections and reads requests but never replies."""
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(('localhost', 0))
+    listener.listen(5)
+    yield listener.getsockname()[1]
+    listener.close()
+
+
+def test_async_resume_timeout_raises_connection_error(silent_server):
+    async def scenario():
+        client = AsyncRegistrarClient('localhost', silent_server, read_timeout=0.2,
+                                      max_retries=0)
+        client._credentials = ("alice", "pw")
+        with pytest.raises(RegistrarConnectionError):
+            await client.connect()
+        assert client._writer is None
+        assert client._reader_task is None
+
+    asyncio.run(scenario())
+
+
+def test_async_send_after_server_hangup_raises_connection_error(memory_server):
+    async def scenario():
+        client = AsyncRegistrarClient('localhost', memory_server.port, max_retries=0)
+        await client.connect()
+        client._writer.close()
+        client._writer = None  # what _read_replies does when the server hangs up
+        with pytest.raises(RegistrarConnectionError):
+            await client._send(client._prepare({"command": "list_courses"}))
+        await client.close()
+
+    asyncio.run(scenario())
+
+
+class ScriptedServer:
+    """
+    Fake registrar that runs one handler per accepted connection, in order,
+    so tests can reorder replies or hang up at exact points. Connections
+    beyond the script are still accepted and their requests recorded.
+    """
+
+    def __init__(self, *handlers):
+        self.handlers = list(handlers)
+        self.requests = []
+        self.connections = 0
+        self.listener = socket.create_server(('localhost', 0))
+        self.port = self.listener.getsockname()[1]
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+            self.connections += 1
+            handler = self.handlers.pop(0) if self.handlers else record_forever
+            with conn:
+                try:
+                    handler(Peer(self, conn))
+                except (OSError, ValueError):
+                    pass
+
+    def close(self):
+        self.listener.close()
+
+
+class Peer:
+    def __init__(self, server, conn):
+        self.server = server
+        self.conn = conn
+        self.lines = conn.makefile("rb")
+
+    def read(self):
+        line = self.lines.readline()
+        if not line:
+            raise OSError("client hung up")
+        request = json.loads(line)
+        self.server.requests.append(request)
+        return request
+
+    def reply(self, request, **fields):
+        response = {"status": "success", "request_id": request["request_id"], **fields}
+        self.conn.sendall((json.dumps(response) + "\n").encode())
+
+
+def record_forever(peer):
+    while True:
+        peer.read()
+
+
+def reply_in_reverse(count):
+    def handler(peer):
+        requests = [peer.read() for _ in range(count)]
+        for request in reversed(requests):
+            peer.reply(request, echo=request["command"])
+    return handler
+
+
+def test_pipelined_replies_out_of_order_are_matched():
+    server = ScriptedServer(reply_in_reverse(3))
+    client = RegistrarClient('localhost', server.port, read_timeout=2)
+    client.connect()
+
+    responses = client.pipeline([{"command": "a"}, {"command": "b"}, {"command": "c"}])
+
+    assert [r["echo"] for r in responses] == ["a", "b", "c"]
+    client.close()
+    server.close()
+
+
+def test_async_concurrent_replies_out_of_order_are_matched():
+    server = ScriptedServer(reply_in_reverse(3))
+
+    async def scenario():
+        async with AsyncRegistrarClient('localhost', server.port, read_timeout=2) as client:
+            return await client.pipeline([{"command": "a"}, {"command": "b"},
+                                          {"command": "c"}])
+
+    assert [r["echo"] for r in asyncio.run(scenario())] == ["a", "b", "c"]
+    server.close()
+
+
+def test_reconnect_replays_login_after_server_close():
+    def first(peer):
+        peer.reply(peer.read(), role="admin")  # login, then hang up
+
+    def second(peer):
+        login = peer.read()
+        assert login["command"] == "login"
+        peer.reply(login, role="admin")
+        request = peer.read()
+        peer.reply(request, courses=[])
+
+    server = ScriptedServer(first, second)
+    client = RegistrarClient('localhost', server.port, read_timeout=2, backoff_base=0.01)
+    client.connect()
+    client.request({"command": "login", "username": "admin", "password": "admin123"})
+    time.sleep(0.1)  # let the hang-up arrive
+
+    response = client.request({"command": "list_courses"})
+
+    assert response["courses"] == []
+    assert [r["command"] for r in server.requests] == ["login", "login", "list_courses"]
+    assert server.requests[1]["username"] == "admin"
+    assert server.requests[1]["password"] == "admin123"
+    client.close()
+    server.close()
+
+
+def test_idempotent_command_is_resent_after_lost_reply():
+    def drop(peer):
+        peer.read()  # hang up without replying
+
+    def answer(peer):
+        peer.reply(peer.read(), courses=[])
+
+    server = ScriptedServer(drop, answer)
+    client = RegistrarClient('localhost', server.port, read_timeout=2, backoff_base=0.01)
+    client.connect()
+
+    assert client.request({"command": "list_courses"})["courses"] == []
+    assert [r["command"] for r in server.requests] == ["list_courses", "list_courses"]
+    client.close()
+    server.close()
+
+
+def test_non_idempotent_command_is_not_resent():
+    def drop(peer):
+        peer.read()  # the registration may have been applied; reply is lost
+
+    server = ScriptedServer(drop)
+    client = RegistrarClient('localhost', server.port, read_timeout=2, backoff_base=0.01)
+    client.connect()
+
+    with pytest.raises(RegistrarConnectionError):
+        client.request({"command": "register_course", "username": "alice",
+                        "course_name": "EECE350"})
+    time.sleep(0.1)
+
+    assert [r["command"] for r in server.requests] == ["register_course"]
+    assert server.connections == 1
+    server.close()
+
+
+def test_pool_reuses_connections(memory_server):
+    pool = RegistrarClientPool('localhost', memory_server.port, size=2,
+                               login=("admin", "admin123"))
+
+    for _ in range(10):
+        assert pool.request({"command": "list_courses"})["status"] == "success"
+    assert len(pool._clients) == 1
+
+    with pool.client() as first, pool.client() as second:
+        assert first is not second
+        assert second.request({"command": "analytics_fill_rates"})["status"] == "success"
+    assert len(pool._clients) == 2
+
+    threads = [threading.Thread(target=pool.request, args=({"command": "list_courses"},))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(pool._clients) == 2
+    pool.close()
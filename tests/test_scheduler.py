@@ -0,0 +1,145 @@
+import time
+
+from scheduler import DEFAULT_COHORT, RegistrationScheduler
+from Server import AUBRegistrarServer
+
+
+def by_cohort(windows):
+    return {window["cohort"]: window for window in windows}
+
+
+def test_no_windows_means_always_open():
+    scheduler = RegistrationScheduler()
+
+    assert scheduler.retry_at("alice") is None
+
+
+def test_cohort_window_and_default():
+    scheduler = RegistrationScheduler()
+    scheduler.set_cohort("seniors", 100.0, ["alice"])
+    scheduler.set_default_start(200.0)
+
+    assert scheduler.retry_at("alice", now=50.0) == 100.0
+    assert scheduler.retry_at("alice", now=100.0) is None
+    assert scheduler.retry_at("bob", now=150.0) == 200.0
+
+
+def test_earliest_cohort_wins():
+    scheduler = RegistrationScheduler()
+    scheduler.set_cohort("late", 300.0, ["alice"])
+    scheduler.set_cohort("early", 100.0, ["alice"])
+
+    assert scheduler.retry_at("alice", now=0.0) == 100.0
+    assert by_cohort(scheduler.admissions(["alice"]))["late"]["students"] == 0
+
+
+def test_admissions_count_only_known_students():
+    scheduler = RegistrationScheduler()
+    scheduler.set_cohort("seniors", 100.0, ["b", "zzz"])
+
+    windows = scheduler.admissions(["a", "b", "c"])
+
+    assert [window["cohort"] for window in windows] == [DEFAULT_COHORT, "seniors"]
+    assert by_cohort(windows)["seniors"]["students"] == 1
+    assert by_cohort(windows)[DEFAULT_COHORT]["students"] == 2
+    assert windows[-1]["cumulative"] == 3
+
+
+def test_server_rejects_unknown_cohort_students(memory_server, admin_session):
+    with memory_server.open_storage() as db:
+        def send(request):
+            return memory_server.process_request(request, db, admin_session)
+
+        for username in "abc":
+            send({"command": "add_student", "student_username": username,
+                  "student_password": "pw", "student_full_name": username})
+
+        response = send({"command": "set_registration_window", "cohort": "seniors",
+                         "start": time.time() + 60, "usernames": ["b", "zzz"]})
+        assert response["status"] == "error"
+        assert "zzz" in response["message"]
+
+        send({"command": "set_registration_window", "cohort": "seniors",
+              "start": time.time() + 60, "usernames": ["b"]})
+        windows = by_cohort(send({"command": "registration_windows"})["windows"])
+
+    assert windows["seniors"]["students"] == 1
+    assert windows[DEFAULT_COHORT]["students"] == 2
+
+
+def test_gate_uses_logged_in_student(memory_server, admin_session):
+    with memory_server.open_storage() as db:
+        def send(request, session):
+            return memory_server.process_request(request, db, session)
+
+        for username in ("early", "late"):
+            send({"command": "add_student", "student_username": username,
+                  "student_password": "pw", "student_full_name": username}, admin_session)
+        send({"command": "create_course", "course_name": "EECE350",
+              "capacity": 10, "schedule": "MWF 10:00"}, admin_session)
+        send({"command": "set_registration_window", "cohort": "later",
+              "start": time.time() + 3600, "usernames": ["late"]}, admin_session)
+
+        session = {}
+        send({"command": "login", "username": "late", "password": "pw"}, session)
+        # Claiming an open student's name does not lift the session's own window
+        response = send({"command": "register_course", "username": "early",
+                         "course_name": "EECE350"}, session)
+
+    assert response["status"] == "error"
+    assert "retry_at" in response
+
+
+def test_load_replaces_windows_and_reads_default():
+    scheduler = RegistrationScheduler()
+    scheduler.set_cohort("stale", 500.0, ["carol"])
+
+    scheduler.load([{"cohort": "seniors", "start": 100.0, "usernames": ["alice"]},
+                    {"cohort": DEFAULT_COHORT, "start": 200.0, "usernames": []}])
+
+    assert scheduler.retry_at("alice", now=50.0) == 100.0
+    assert scheduler.retry_at("carol", now=150.0) == 200.0
+    assert "stale" not in by_cohort(scheduler.admissions([]))
+
+
+def test_windows_survive_server_restart(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # the sqlite backend writes aub_registrar.db to the cwd
+    admin = {"username": "admin", "role": "admin"}
+    later = time.time() + 3600
+
+    server = AUBRegistrarServer(0, "sqlite")
+    try:
+        with server.open_storage() as db:
+            db.add_student("alice", "pw", "Alice A")
+            for request in ({"command": "set_registration_window", "cohort": "seniors",
+                             "start": later, "usernames": ["alice"]},
+                            {"command": "set_default_window", "start": later + 60}):
+                assert server.process_request(request, db, admin)["status"] == "success"
+    finally:
+        server.server_socket.close()
+
+    restarted = AUBRegistrarServer(0, "sqlite")
+    try:
+        assert restarted.scheduler.retry_at("alice") == later
+        assert restarted.scheduler.retry_at("bob") == later + 60
+
+        with restarted.open_storage() as db:
+            response = restarted.process_request({"command": "register_course",
+                                                  "username": "alice",
+                                                  "course_name": "EECE350"}, db)
+            assert response["retry_at"] == later
+
+            for request in ({"command": "remove_registration_window", "cohort": "seniors"},
+                            {"command": "set_default_window"}):
+                assert restarted.process_request(request, db, admin)["status"] == "success"
+            assert db.get_registration_windows() == []
+    finally:
+        restarted.server_socket.close()
+
+
+def test_default_cohort_name_is_reserved(memory_server, admin_session):
+    with memory_server.open_storage() as db:
+        for request in ({"command": "set_registration_window", "cohort": DEFAULT_COHORT,
+                         "start": time.time() + 3600, "usernames": []},
+                        {"command": "remove_registration_window", "cohort": DEFAULT_COHORT}):
+            assert memory_server.process_request(request, db, admin_session)["status"] == "error"
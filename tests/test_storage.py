@@ -0,0 +1,253 @@
+"""Conformance tests: every case runs against both storage engines."""
+import pytest
+
+import database
+import memory_database
+from database import AUBRegistrarDatabase
+from memory_database import InMemoryRegistrarDatabase
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def open_engine(request, tmp_path, monkeypatch):
+    def open_engine(change_log_size=None):
+        if change_log_size is not None:
+            monkeypatch.setattr(database, "CHANGE_LOG_SIZE", change_log_size)
+            monkeypatch.setattr(memory_database, "CHANGE_LOG_SIZE", change_log_size)
+        if request.param == "sqlite":
+            return AUBRegistrarDatabase(str(tmp_path / "aub_registrar.db"))
+        return InMemoryRegistrarDatabase()
+    return open_engine
+
+
+@pytest.fixture
+def db(open_engine):
+    with open_engine() as engine:
+        engine.add_student("alice", "pw", "Alice A")
+        yield engine
+
+
+def course(db, course_name):
+    return next(c for c in db.get_courses() if c["course_name"] == course_name)
+
+
+def test_add_student_rejects_duplicates(db):
+    assert not db.add_student("alice", "other", "Someone Else")
+    assert db.add_student("bob", "pw", "Bob B")
+    assert sorted(db.get_student_usernames()) == ["alice", "bob"]
+
+
+def test_create_course_rejects_duplicates(db):
+    assert db.create_course("EECE350", 30, "MWF 10:00")
+    assert not db.create_course("EECE350", 10, "TR 11:00")
+    assert db.get_courses() == [{"course_name": "EECE350", "capacity": 30, "remaining": 30,
+                                 "schedule": "MWF 10:00", "students": []}]
+
+
+def test_register_and_withdraw(db):
+    db.create_course("EECE350", 2, "MWF 10:00")
+
+    assert db.register_course("alice", "EECE350")
+    assert db.get_student_courses("alice") == ["EECE350"]
+    assert course(db, "EECE350")["remaining"] == 1
+    assert course(db, "EECE350")["students"] == ["alice"]
+
+    assert db.withdraw_course("alice", "EECE350")
+    assert db.get_student_courses("alice") == []
+    assert course(db, "EECE350")["remaining"] == 2
+
+
+def test_five_course_cap(db):
+    for i in range(6):
+        db.create_course(f"C{i}", 10, f"slot {i}")
+    for i in range(5):
+        assert db.register_course("alice", f"C{i}")
+
+    assert not db.register_course("alice", "C5")
+    assert len(db.get_student_courses("alice")) == 5
+
+
+def test_schedule_conflict_rejected(db):
+    db.create_course("EECE350", 10, "MWF 10:00")
+    db.create_course("EECE330", 10, "MWF 10:00")
+
+    assert db.register_course("alice", "EECE350")
+    assert not db.register_course("alice", "EECE330")
+
+
+def test_duplicate_registration_rejected(db):
+    db.create_course("EECE350", 10, "MWF 10:00")
+
+    assert db.register_course("alice", "EECE350")
+    assert not db.register_course("alice", "EECE350")
+    assert course(db, "EECE350")["remaining"] == 9
+
+
+def test_full_course_rejected(db):
+    db.add_student("bob", "pw", "Bob B")
+    db.create_course("EECE350", 1, "MWF 10:00")
+
+    assert db.register_course("alice", "EECE350")
+    assert not db.register_course("bob", "EECE350")
+    assert course(db, "EECE350")["remaining"] == 0
+
+
+def test_unknown_student_or_course_rejected(db):
+    db.create_course("EECE350", 10, "MWF 10:00")
+
+    assert not db.register_course("nobody", "EECE350")
+    assert not db.register_course("alice", "NOPE")
+    assert not db.withdraw_course("alice", "NOPE")
+    assert db.get_student_courses("nobody") == []
+
+
+def test_capacity_increase_keeps_enrolled(db):
+    db.create_course("EECE350", 1, "MWF 10:00")
+    db.register_course("alice", "EECE350")
+
+    assert db.update_course_capacity("EECE350", 3)
+    assert course(db, "EECE350")["capacity"] == 3
+    assert course(db, "EECE350")["remaining"] == 2
+
+
+def test_capacity_decrease_rejected(db):
+    db.create_course("EECE350", 5, "MWF 10:00")
+
+    assert not db.update_course_capacity("EECE350", 4)
+    assert not db.update_course_capacity("NOPE", 10)
+    assert course(db, "EECE350")["capacity"] == 5
+
+
+def test_withdraw_when_not_enrolled(db):
+    db.create_course("EECE350", 5, "MWF 10:00")
+
+    assert not db.withdraw_course("alice", "EECE350")
+    assert course(db, "EECE350")["remaining"] == 5
+
+
+def test_authenticate(db):
+    assert db.authenticate("admin", "admin123") == "admin"
+    assert db.authenticate("alice", "pw") == "student"
+    assert db.authenticate("alice", "wrong") is None
+    assert db.authenticate("nobody", "pw") is None
+
+
+def test_catalog_version_bumps_on_every_course_mutation(db):
+    start = db.get_catalog_version()
+
+    db.create_course("EECE350", 5, "MWF 10:00")
+    db.register_course("alice", "EECE350")
+    db.withdraw_course("alice", "EECE350")
+    db.update_course_capacity("EECE350", 6)
+    assert db.get_catalog_version() == start + 4
+
+    # Failed mutations and student changes leave the catalog alone
+    db.create_course("EECE350", 5, "MWF 10:00")
+    db.withdraw_course("alice", "EECE350")
+    db.add_student("bob", "pw", "Bob B")
+    assert db.get_catalog_version() == start + 4
+
+
+def test_courses_since_returns_only_changes(db):
+    db.create_course("EECE350", 5, "MWF 10:00")
+    db.create_course("EECE330", 5, "TR 11:00")
+    version = db.get_catalog_version()
+
+    db.register_course("alice", "EECE330")
+    db.update_course_capacity("EECE330", 8)
+
+    delta = db.get_courses_since(version)
+    assert delta == {"version": version + 2,
+                     "courses": [course(db, "EECE330")],
+                     "deleted": []}
+    assert db.get_courses_since(version + 2) == {"version": version + 2,
+                                                 "courses": [], "deleted": []}
+
+
+def test_courses_since_future_version_needs_resync(db):
+    version = db.get_catalog_version()
+
+    assert db.get_courses_since(version + 1) == {"version": version, "resync": True}
+
+
+def test_courses_since_trimmed_log_needs_resync(open_engine):
+    with open_engine(change_log_size=3) as db:
+        db.create_course("EECE350", 10, "MWF 10:00")
+        for capacity in range(11, 16):
+            db.update_course_capacity("EECE350", capacity)
+        version = db.get_catalog_version()
+        assert version == 6
+
+        assert db.get_courses_since(2) == {"version": 6, "resync": True}
+        # The last three changes are still covered
+        assert db.get_courses_since(3) == {"version": 6,
+                                           "courses": [course(db, "EECE350")],
+                                           "deleted": []}
+
+
+@pytest.mark.parametrize("missing", ["username", "password", "full_name"])
+def test_add_student_requires_every_field(db, missing):
+    fields = {"username": "bob", "password": "pw", "full_name": "Bob B"}
+    fields[missing] = None
+
+    assert not db.add_student(**fields)
+    assert "bob" not in db.get_student_usernames()
+
+
+def test_student_added_without_password_cannot_log_in(db):
+    db.add_student("ghost", None, "Ghost")
+
+    assert db.authenticate("ghost", None) is None
+
+
+@pytest.mark.parametrize("capacity", [None, "abc", "", 2.5, True, -1, [3]])
+def test_create_course_rejects_invalid_capacity(db, capacity):
+    assert not db.create_course("EECE350", capacity, "MWF 10:00")
+    assert db.get_courses() == []
+
+
+def test_create_course_requires_name_and_schedule(db):
+    assert not db.create_course(None, 10, "MWF 10:00")
+    assert not db.create_course("EECE350", 10, None)
+    assert db.get_courses() == []
+
+
+def test_create_course_coerces_integer_strings(db):
+    assert db.create_course("EECE350", "3", "MWF 10:00")
+    assert course(db, "EECE350")["capacity"] == 3
+
+    assert db.register_course("alice", "EECE350")
+    assert course(db, "EECE350")["remaining"] == 2
+
+
+@pytest.mark.parametrize("new_capacity", [None, "abc", 2.5, True])
+def test_update_capacity_rejects_invalid_value_without_partial_update(db, new_capacity):
+    db.create_course("EECE350", 3, "MWF 10:00")
+    db.register_course("alice", "EECE350")
+    version = db.get_catalog_version()
+
+    assert not db.update_course_capacity("EECE350", new_capacity)
+    assert course(db, "EECE350")["capacity"] == 3
+    assert course(db, "EECE350")["remaining"] == 2
+    assert db.get_catalog_version() == version
+
+
+def test_update_capacity_coerces_integer_strings(db):
+    db.create_course("EECE350", 3, "MWF 10:00")
+
+    assert db.update_course_capacity("EECE350", "5")
+    assert course(db, "EECE350")["capacity"] == 5
+    assert course(db, "EECE350")["remaining"] == 5
+
+
+def test_registration_windows_round_trip(db):
+    db.save_registration_window("seniors", 100.0, ["alice"])
+    db.save_registration_window("juniors", 200.0, [])
+    db.save_registration_window("seniors", 150.0, ["alice", "bob"])
+
+    windows = sorted(db.get_registration_windows(), key=lambda window: window["cohort"])
+    assert windows == [{"cohort": "juniors", "start": 200.0, "usernames": []},
+                       {"cohort": "seniors", "start": 150.0, "usernames": ["alice", "bob"]}]
+
+    assert db.delete_registration_window("juniors")
+    assert not db.delete_registration_window("juniors")
+    assert [window["cohort"] for window in db.get_registration_windows()] == ["seniors"]